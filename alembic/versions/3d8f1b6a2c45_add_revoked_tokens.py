@@ -0,0 +1,43 @@
+"""Add revoked tokens
+
+Revision ID: 3d8f1b6a2c45
+Revises: 9a6c3e15b7d2
+Create Date: 2026-10-17 02:14:08.415927
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "3d8f1b6a2c45"
+down_revision: Union[str, Sequence[str], None] = "9a6c3e15b7d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "revokedtokens",
+        sa.Column("jti", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("expires_at", sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+        sa.Column("revoked_at", sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("jti"),
+    )
+    op.create_index(
+        op.f("ix_revokedtokens_expires_at"), "revokedtokens", ["expires_at"]
+    )
+    op.create_index(
+        op.f("ix_revokedtokens_revoked_at"), "revokedtokens", ["revoked_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_revokedtokens_revoked_at"), table_name="revokedtokens")
+    op.drop_index(op.f("ix_revokedtokens_expires_at"), table_name="revokedtokens")
+    op.drop_table("revokedtokens")
@@ -0,0 +1,49 @@
+"""Add orders created_at and keyset pagination indexes
+
+Revision ID: 4b1f6c2e9a07
+Revises: d513e00f9445
+Create Date: 2026-10-16 20:52:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4b1f6c2e9a07"
+down_revision: Union[str, Sequence[str], None] = "d513e00f9445"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Add nullable, backfill existing rows, then enforce NOT NULL
+    op.add_column(
+        "orders",
+        sa.Column("created_at", sqlmodel.sql.sqltypes.UTCDateTime(), nullable=True),
+    )
+    op.execute("UPDATE orders SET created_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.alter_column(
+            "created_at",
+            existing_type=sqlmodel.sql.sqltypes.UTCDateTime(),
+            nullable=False,
+        )
+    op.create_index("ix_orders_created_at_uid", "orders", ["created_at", "uid"])
+    op.create_index(
+        "ix_orders_user_uid_created_at_uid",
+        "orders",
+        ["user_uid", "created_at", "uid"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_orders_user_uid_created_at_uid", table_name="orders")
+    op.drop_index("ix_orders_created_at_uid", table_name="orders")
+    op.drop_column("orders", "created_at")
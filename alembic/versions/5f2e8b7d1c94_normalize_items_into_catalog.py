@@ -0,0 +1,151 @@
+"""Normalize items into a catalog
+
+Revision ID: 5f2e8b7d1c94
+Revises: c7d41a9e2f60
+Create Date: 2026-10-17 00:12:37.540921
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2e8b7d1c94"
+down_revision: Union[str, Sequence[str], None] = "c7d41a9e2f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_item_sales(key_columns: list, *constraints) -> None:
+    op.create_table(
+        "itemsales",
+        *key_columns,
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint(*(column.name for column in key_columns)),
+        *constraints,
+    )
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema. The catalog is filled from the distinct products and sizes
+    already in items, priced at the highest price they were sold at. Rebuild the
+    sales rollups afterwards with `python -m database.rollups`.
+    """
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("flavor", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name", "flavor"),
+    )
+    op.create_table(
+        "sizes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_table(
+        "prices",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("size_id", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["size_id"], ["sizes.id"]),
+        sa.PrimaryKeyConstraint("product_id", "size_id"),
+    )
+    op.create_table(
+        "catalogversion",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.execute(
+        "INSERT INTO products (name, flavor) SELECT DISTINCT name, flavor FROM items"
+    )
+    op.execute("INSERT INTO sizes (name) SELECT DISTINCT size FROM items")
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.add_column(sa.Column("product_id", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("size_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE items SET"
+        " product_id = (SELECT products.id FROM products"
+        " WHERE products.name = items.name AND products.flavor = items.flavor),"
+        " size_id = (SELECT sizes.id FROM sizes WHERE sizes.name = items.size)"
+    )
+    op.execute(
+        "INSERT INTO prices (product_id, size_id, unit_price)"
+        " SELECT product_id, size_id, MAX(unit_price) FROM items"
+        " GROUP BY product_id, size_id"
+    )
+    op.execute("INSERT INTO catalogversion (id, version) VALUES (1, 1)")
+
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.alter_column("product_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column("size_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            "fk_items_product_id_products", "products", ["product_id"], ["id"]
+        )
+        batch_op.create_foreign_key(
+            "fk_items_size_id_sizes", "sizes", ["size_id"], ["id"]
+        )
+        batch_op.drop_column("name")
+        batch_op.drop_column("flavor")
+        batch_op.drop_column("size")
+
+    op.drop_table("itemsales")
+    create_item_sales(
+        [
+            sa.Column("product_id", sa.Integer(), nullable=False),
+            sa.Column("size_id", sa.Integer(), nullable=False),
+        ],
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["size_id"], ["sizes.id"]),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema. Rebuild the sales rollups afterwards."""
+    op.drop_table("itemsales")
+    create_item_sales(
+        [
+            sa.Column("flavor", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("size", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        ]
+    )
+
+    with op.batch_alter_table("items") as batch_op:
+        for name in ("name", "flavor", "size"):
+            batch_op.add_column(
+                sa.Column(
+                    name,
+                    sqlmodel.sql.sqltypes.AutoString(),
+                    nullable=False,
+                    server_default="",
+                )
+            )
+    op.execute(
+        "UPDATE items SET"
+        " name = (SELECT products.name FROM products"
+        " WHERE products.id = items.product_id),"
+        " flavor = (SELECT products.flavor FROM products"
+        " WHERE products.id = items.product_id),"
+        " size = (SELECT sizes.name FROM sizes WHERE sizes.id = items.size_id)"
+    )
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.drop_constraint("fk_items_product_id_products", type_="foreignkey")
+        batch_op.drop_constraint("fk_items_size_id_sizes", type_="foreignkey")
+        batch_op.drop_column("product_id")
+        batch_op.drop_column("size_id")
+
+    op.drop_table("catalogversion")
+    op.drop_table("prices")
+    op.drop_table("sizes")
+    op.drop_table("products")
@@ -0,0 +1,32 @@
+"""Add orders version
+
+Revision ID: 8e3a5d71c4b2
+Revises: 4b1f6c2e9a07
+Create Date: 2026-10-16 21:24:05.392817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3a5d71c4b2"
+down_revision: Union[str, Sequence[str], None] = "4b1f6c2e9a07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "orders",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("orders", "version")
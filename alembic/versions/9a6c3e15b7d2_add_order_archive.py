@@ -0,0 +1,74 @@
+"""Add order archive
+
+Revision ID: 9a6c3e15b7d2
+Revises: 5f2e8b7d1c94
+Create Date: 2026-10-17 01:05:19.823340
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "9a6c3e15b7d2"
+down_revision: Union[str, Sequence[str], None] = "5f2e8b7d1c94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "archivedorders",
+        sa.Column("uid", sa.Uuid(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "COMPLETED", "CANCELLED", name="mystatus"),
+            nullable=False,
+        ),
+        sa.Column("user_uid", sa.Uuid(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("created_at", sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_uid"], ["users.uid"]),
+        sa.PrimaryKeyConstraint("uid"),
+    )
+    op.create_index(
+        "ix_archivedorders_created_at_uid",
+        "archivedorders",
+        ["created_at", "uid"],
+    )
+    op.create_index(
+        "ix_archivedorders_user_uid_created_at_uid",
+        "archivedorders",
+        ["user_uid", "created_at", "uid"],
+    )
+    op.create_table(
+        "archiveditems",
+        sa.Column("uid", sa.Uuid(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("size_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.Column("order_uid", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["order_uid"], ["archivedorders.uid"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["size_id"], ["sizes.id"]),
+        sa.PrimaryKeyConstraint("uid"),
+    )
+    op.create_index(op.f("ix_archiveditems_order_uid"), "archiveditems", ["order_uid"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_archiveditems_order_uid"), table_name="archiveditems")
+    op.drop_table("archiveditems")
+    op.drop_index(
+        "ix_archivedorders_user_uid_created_at_uid", table_name="archivedorders"
+    )
+    op.drop_index("ix_archivedorders_created_at_uid", table_name="archivedorders")
+    op.drop_table("archivedorders")
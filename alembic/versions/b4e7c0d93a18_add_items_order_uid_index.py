@@ -0,0 +1,27 @@
+"""Add items order_uid index
+
+Revision ID: b4e7c0d93a18
+Revises: 3d8f1b6a2c45
+Create Date: 2026-10-17 03:02:41.207514
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e7c0d93a18"
+down_revision: Union[str, Sequence[str], None] = "3d8f1b6a2c45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_items_order_uid"), "items", ["order_uid"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_items_order_uid"), table_name="items")
@@ -0,0 +1,56 @@
+"""Add sales rollups
+
+Revision ID: c7d41a9e2f60
+Revises: 8e3a5d71c4b2
+Create Date: 2026-10-16 23:02:41.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d41a9e2f60"
+down_revision: Union[str, Sequence[str], None] = "8e3a5d71c4b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. Populate the new tables with `python -m database.rollups`."""
+    op.create_table(
+        "dailysales",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "statuscounts",
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "COMPLETED", "CANCELLED", name="mystatus"),
+            nullable=False,
+        ),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("status"),
+    )
+    op.create_table(
+        "itemsales",
+        sa.Column("flavor", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("size", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("flavor", "size"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("itemsales")
+    op.drop_table("statuscounts")
+    op.drop_table("dailysales")
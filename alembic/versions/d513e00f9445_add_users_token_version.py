@@ -0,0 +1,32 @@
+"""Add users token_version
+
+Revision ID: d513e00f9445
+Revises: ed02291e30bc
+Create Date: 2026-10-16 20:40:12.481230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d513e00f9445"
+down_revision: Union[str, Sequence[str], None] = "ed02291e30bc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "token_version")
@@ -0,0 +1,28 @@
+"""Add orders status index
+
+Revision ID: e1a9c4f27b63
+Revises: b4e7c0d93a18
+Create Date: 2026-10-17 09:14:52.630187
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e1a9c4f27b63"
+down_revision: Union[str, Sequence[str], None] = "b4e7c0d93a18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. Pending orders are now counted from the orders table."""
+    op.create_index(op.f("ix_orders_status"), "orders", ["status"])
+    op.execute("DELETE FROM statuscounts WHERE status = 'PENDING'")
+
+
+def downgrade() -> None:
+    """Downgrade schema. Re-run `python -m database.rollups` to restore the PENDING count."""
+    op.drop_index(op.f("ix_orders_status"), table_name="orders")
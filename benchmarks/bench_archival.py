@@ -0,0 +1,103 @@
+"""
+Latency of the hot order reads before and after archiving: seeds one user
+with mostly old, finalized orders, times the listings, runs the archival
+job, and times them again (also with include_archived=true).
+
+Usage: python -m benchmarks.bench_archival [--orders 20000] [--recent 0.1]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+from benchmarks.common import (
+    auth_headers,
+    configure_sqlite,
+    percentile,
+    seed_admin,
+    seed_catalog,
+    seed_orders,
+)
+
+configure_sqlite("archival")
+
+import httpx
+from database.archive import archive_orders
+from database.conn import MyStatus, create_db_and_tables, utc_now
+from main import app
+
+PATHS = ["/orders/user-orders", "/orders/?limit=20"]
+
+
+def archival_fields(count: int, recent: float):
+    """Orders fields making all but the newest `recent` share old and completed."""
+    now = utc_now()
+
+    def fields(i: int) -> dict:
+        is_recent = i >= count * (1 - recent)
+        return {
+            "status": MyStatus.PENDING if is_recent else MyStatus.COMPLETED,
+            "created_at": now - timedelta(days=1 if is_recent else 365, minutes=i),
+        }
+
+    return fields
+
+
+async def measure(client, headers, repeat: int, suffix: str = "") -> dict:
+    """p50 milliseconds per path."""
+    results = {}
+    for path in PATHS:
+        url = path + ("&" if "?" in path else "?") + suffix if suffix else path
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+        results[path] = percentile(samples, 50)
+    return results
+
+
+async def main(order_count: int, recent: float, repeat: int):
+    create_db_and_tables()
+    catalog = seed_catalog()
+    user = seed_admin()
+    headers = auth_headers(user)
+    seed_orders(
+        user,
+        order_count,
+        catalog,
+        items_per_order=2,
+        order_fields=archival_fields(order_count, recent),
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await measure(client, headers, 3)  # warm up
+        before = await measure(client, headers, repeat)
+        start = time.perf_counter()
+        moved = await asyncio.to_thread(archive_orders, timedelta(days=90))
+        archive_seconds = time.perf_counter() - start
+        after = await measure(client, headers, repeat)
+        with_archive = await measure(client, headers, repeat, "include_archived=true")
+
+    print(f"orders={order_count} recent={recent:.0%}")
+    print(f"archived {moved} orders in {archive_seconds:.2f}s")
+    print(f"{'p50 ms':28} {'before':>8} {'after':>8} {'+archive':>9}")
+    for path in PATHS:
+        print(
+            f"{path:28} {before[path]:8.2f} {after[path]:8.2f} "
+            f"{with_archive[path]:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--recent", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.recent, args.repeat))
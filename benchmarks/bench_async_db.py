@@ -0,0 +1,108 @@
+"""
+Concurrent request throughput of the blocking Session path against the
+AsyncSession path, both running the same user lookup.
+
+Every request also runs `SELECT sleep_ms(n)` to stand in for a network round
+trip: the sync driver sleeps on the event loop thread, aiosqlite sleeps on its
+worker thread, just as PyMySQL and aiomysql would wait on the socket.
+Sessions are opened inside the handlers: with the old `get_session` dependency
+the blocked loop cannot run the teardown that returns connections, so a long
+run stalls on pool checkout instead of finishing.
+
+Usage: python -m benchmarks.bench_async_db [--requests 200] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import configure_sqlite
+
+configure_sqlite("async_db")
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event, func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import Users, async_engine, create_db_and_tables, engine
+
+EMAIL = "bench@example.com"
+latency_ms = 5
+
+
+def _sleep_ms(ms: int) -> int:
+    time.sleep(ms / 1000)
+    return ms
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+app = FastAPI()
+
+
+@app.get("/sync")
+async def sync_lookup():
+    with Session(engine) as db:
+        db.exec(select(func.sleep_ms(latency_ms))).one()
+        user = db.exec(select(Users).where(Users.email == EMAIL)).first()
+        return {"uid": user.uid}
+
+
+@app.get("/async")
+async def async_lookup():
+    async with AsyncSession(async_engine) as db:
+        (await db.exec(select(func.sleep_ms(latency_ms)))).one()
+        user = (await db.exec(select(Users).where(Users.email == EMAIL))).first()
+        return {"uid": user.uid}
+
+
+async def run(path: str, requests: int, concurrency: int) -> float:
+    """Fire `requests` GETs at `path` with bounded concurrency; return req/s."""
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await one()  # warm up the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    global latency_ms
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=5)
+    args = parser.parse_args()
+    latency_ms = args.latency_ms
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        session.add(Users(name="bench", email=EMAIL, password="benchmark1"))
+        session.commit()
+
+    before = asyncio.run(run("/sync", args.requests, args.concurrency))
+    after = asyncio.run(run("/async", args.requests, args.concurrency))
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} latency={latency_ms}ms"
+    )
+    print(f"sync Session   : {before:8.1f} req/s")
+    print(f"AsyncSession   : {after:8.1f} req/s")
+    print(f"speedup        : {after / before:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
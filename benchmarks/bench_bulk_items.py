@@ -0,0 +1,89 @@
+"""
+Adding a 12-item order through POST /orders/add-item (one request and one
+commit per item) against POST /orders/add-items (one request, one INSERT).
+
+Usage: python -m benchmarks.bench_bulk_items [--orders 50] [--items 12]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import auth_headers, configure_sqlite, seed_admin, seed_catalog
+
+configure_sqlite("bulk_items")
+
+import httpx
+from sqlmodel import Session
+from database.conn import Orders, Users, create_db_and_tables, engine
+from database.instrumentation import track_queries
+from main import app
+
+
+def create_orders(user: Users, count: int) -> list[str]:
+    with Session(engine) as session:
+        orders = [Orders(user_uid=user.uid) for _ in range(count)]
+        session.add_all(orders)
+        session.commit()
+        return [str(order.uid) for order in orders]
+
+
+async def run(client, headers, order_ids, items, batch: bool) -> tuple[float, float]:
+    """Return mean milliseconds and SQL statements spent per order."""
+    start = time.perf_counter()
+    with track_queries() as stats:
+        for order_id in order_ids:
+            if batch:
+                response = await client.post(
+                    f"/orders/add-items/{order_id}", json=items, headers=headers
+                )
+                response.raise_for_status()
+            else:
+                for item in items:
+                    response = await client.post(
+                        f"/orders/add-item/{order_id}", json=item, headers=headers
+                    )
+                    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed / len(order_ids) * 1000, stats.count / len(order_ids)
+
+
+async def main(order_count: int, item_count: int):
+    create_db_and_tables()
+    catalog = seed_catalog()
+    user = seed_admin()
+    headers = auth_headers(user)
+    items = [
+        {"product_id": product_id, "size_id": size_id, "quantity": 1}
+        for i in range(item_count)
+        for product_id, size_id, _ in [catalog[i % len(catalog)]]
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await run(client, headers, create_orders(user, 1), items, batch=True)  # warm up
+        per_item = await run(
+            client, headers, create_orders(user, order_count), items, batch=False
+        )
+        batched = await run(
+            client, headers, create_orders(user, order_count), items, batch=True
+        )
+
+    print(f"orders={order_count} items per order={item_count}")
+    print(
+        f"per-item path : {per_item[0]:8.2f} ms/order {per_item[1]:6.1f} statements/order"
+    )
+    print(
+        f"batch path    : {batched[0]:8.2f} ms/order {batched[1]:6.1f} statements/order"
+    )
+    print(f"speedup       : {per_item[0] / batched[0]:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--items", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.items))
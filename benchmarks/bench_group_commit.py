@@ -0,0 +1,121 @@
+"""
+Throughput of bursts of concurrent POST /orders/ requests, committing each
+order on its own against group commit through the ingestion queue. Then one
+burst from that many distinct users, none of them resolved by the user cache
+yet, must all succeed with group commit: requests waiting on the queue must
+not hold the connections its writer needs. Exits non-zero otherwise.
+
+Usage: python -m benchmarks.bench_group_commit [--orders 500] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+from benchmarks.common import auth_headers, configure_sqlite, seed_admin
+
+configure_sqlite("group_commit")
+# Fail fast when requests starve the writer of connections
+os.environ.setdefault("DB_POOL_TIMEOUT", "3")
+
+import httpx
+from sqlmodel import Session, func, select
+from database.conn import Orders, Users, create_db_and_tables, engine
+from database.group_commit import order_ingest
+from main import app
+from security.security import user_cache
+from utils.settings import settings
+
+
+async def burst(client, headers, body, order_count: int, concurrency: int) -> float:
+    """Create `order_count` orders from `concurrency` clients; return orders/s."""
+    remaining = iter(range(order_count))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.post("/orders/", json=body, headers=headers)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return order_count / (time.perf_counter() - start)
+
+
+def seed_users(count: int) -> list[Users]:
+    users = [
+        Users(name=f"user{i}", email=f"user{i}@example.com", password="x")
+        for i in range(count)
+    ]
+    with Session(engine) as session:
+        session.add_all(users)
+        session.commit()
+        for user in users:
+            session.refresh(user)
+            session.expunge(user)
+    return users
+
+
+async def cold_burst(client, users: list[Users]) -> tuple[Counter, float]:
+    """One order per user, all at once; return status codes and seconds."""
+    user_cache.clear()
+
+    async def post(user: Users) -> int:
+        response = await client.post(
+            "/orders/", json={"user_uid": str(user.uid)}, headers=auth_headers(user)
+        )
+        return response.status_code
+
+    start = time.perf_counter()
+    codes = await asyncio.gather(*(post(user) for user in users))
+    return Counter(codes), time.perf_counter() - start
+
+
+async def main(order_count: int, concurrency: int) -> int:
+    create_db_and_tables()
+    user = seed_admin()
+    headers = auth_headers(user)
+    body = {"user_uid": str(user.uid)}
+    users = seed_users(concurrency)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for enabled in (False, True):
+            settings.ORDER_INGEST_ENABLED = enabled
+            await burst(client, headers, body, concurrency, concurrency)  # warm up
+            results[enabled] = await burst(
+                client, headers, body, order_count, concurrency
+            )
+        codes, cold_seconds = await cold_burst(client, users)
+    await order_ingest.close()
+
+    with Session(engine) as session:
+        stored = session.exec(select(func.count()).select_from(Orders)).one()
+    expected = 2 * (order_count + concurrency) + codes[200]
+    stats = order_ingest.stats()
+    print(f"orders={order_count} concurrency={concurrency} stored={stored}/{expected}")
+    print(f"commit per order : {results[False]:8.1f} orders/s")
+    print(
+        f"group commit     : {results[True]:8.1f} orders/s "
+        f"(avg batch {stats['avg_batch_size']:.1f})"
+    )
+    print(f"speedup          : {results[True] / results[False]:8.2f}x")
+    ok = codes == Counter({200: len(users)})
+    print(
+        f"{'ok' if ok else 'FAIL':4} {len(users)} cold-cache users with group "
+        f"commit ({dict(codes)} in {cold_seconds:.2f}s)"
+    )
+    return 0 if ok and stored == expected else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.orders, args.concurrency)))
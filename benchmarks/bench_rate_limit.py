@@ -0,0 +1,84 @@
+"""
+Per-request overhead of RateLimitMiddleware around a no-op ASGI app, for
+anonymous (client IP) and authenticated (JWT subject) requests, and the cost
+of rejecting a request with 429.
+
+Usage: python -m benchmarks.bench_rate_limit [--requests 100000] [--clients 1000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import configure_sqlite
+
+configure_sqlite("rate_limit")
+
+from security.security import create_access_token
+from utils.ratelimit import RateLimit, RateLimitMiddleware
+from utils.settings import settings
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send(message):
+    pass
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def make_scope(client: int, token: str | None) -> dict:
+    headers = [(b"host", b"bench")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/orders/user-orders",
+        "headers": headers,
+        "client": (f"10.0.{client // 256}.{client % 256}", 50000),
+    }
+
+
+async def time_app(app, scopes: list[dict], request_count: int) -> float:
+    """Mean microseconds per request, cycling through `scopes`."""
+    start = time.perf_counter()
+    for i in range(request_count):
+        await app(scopes[i % len(scopes)], receive, send)
+    return (time.perf_counter() - start) / request_count * 1e6
+
+
+async def main(request_count: int, client_count: int):
+    settings.RATE_LIMIT_ENABLED = True
+    limiter = RateLimitMiddleware(noop_app)
+    anonymous = [make_scope(i, None) for i in range(client_count)]
+    authenticated = [
+        make_scope(i, create_access_token({"sub": f"user{i}@example.com"}))
+        for i in range(client_count)
+    ]
+
+    limiter.budgets["default"] = RateLimit(10**9, 1)
+    bare = await time_app(noop_app, anonymous, request_count)
+    by_ip = await time_app(limiter, anonymous, request_count)
+    by_subject = await time_app(limiter, authenticated, request_count)
+    limiter.budgets["default"] = RateLimit(1, 3600)
+    rejected = await time_app(limiter, anonymous, request_count)
+
+    print(f"requests={request_count} clients={client_count}")
+    print(f"no limiter       : {bare:7.2f} us/request")
+    print(f"keyed by IP      : {by_ip:7.2f} us/request (+{by_ip - bare:.2f})")
+    print(f"keyed by subject : {by_subject:7.2f} us/request (+{by_subject - bare:.2f})")
+    print(f"rejected (429)   : {rejected:7.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.clients))
@@ -0,0 +1,160 @@
+"""
+Order total reconciliation: seeds orders with items, makes some totals drift,
+and times the batched set-based check against loading every order with its
+items. Exits non-zero unless exactly the drifted orders are reported, --fix
+corrects them (keeping the revenue rollup equal to a full rebuild), and
+POST /reports/reconcile pages through every order.
+
+Usage: python -m benchmarks.bench_reconcile [--orders 20000] [--items 5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.common import (
+    auth_headers,
+    configure_sqlite,
+    seed_admin,
+    seed_catalog,
+    seed_orders,
+)
+
+configure_sqlite("reconcile")
+
+import httpx
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import (
+    DailySales,
+    MyStatus,
+    Orders,
+    async_engine,
+    create_db_and_tables,
+    engine,
+)
+from database.reconcile import TOLERANCE, reconcile_orders
+from database.rollups import backfill
+from main import app
+
+DRIFT_EVERY = 997
+STATUSES = [MyStatus.PENDING, MyStatus.COMPLETED, MyStatus.CANCELLED]
+
+
+def drift_totals() -> set:
+    """Add a unit to every DRIFT_EVERY-th order's total; return their uids."""
+    with Session(engine) as session:
+        uids = session.exec(select(Orders.uid).order_by(Orders.created_at)).all()
+        drifted = set(uids[::DRIFT_EVERY])
+        session.exec(
+            update(Orders)
+            .where(Orders.uid.in_(drifted))
+            .values(total=Orders.total + 1.0)
+        )
+        session.commit()
+    return {str(uid) for uid in drifted}
+
+
+async def load_everything() -> set:
+    """The approach this replaces: every order and its items in Python."""
+    async with AsyncSession(async_engine) as db:
+        orders = await db.exec(select(Orders).options(selectinload(Orders.items)))
+        return {
+            str(order.uid)
+            for order in orders
+            if abs(order.total - sum(i.quantity * i.unit_price for i in order.items))
+            > TOLERANCE
+        }
+
+
+async def reconcile(fix: bool, batch_size: int) -> tuple[int, int]:
+    """Orders checked and mismatched in a full reconciliation run."""
+    checked = mismatched = 0
+    async for batch in reconcile_orders(fix, batch_size=batch_size):
+        checked += batch.checked
+        mismatched += len(batch.mismatches)
+    return checked, mismatched
+
+
+def daily_sales() -> dict:
+    with Session(engine) as session:
+        return {
+            row.day: (row.orders, round(row.revenue, 6))
+            for row in session.exec(select(DailySales))
+        }
+
+
+async def main(order_count: int, items_per_order: int, batch_size: int) -> int:
+    create_db_and_tables()
+    catalog = seed_catalog()
+    user = seed_admin()
+    seed_orders(
+        user,
+        order_count,
+        catalog,
+        items_per_order=items_per_order,
+        order_fields=lambda i: {"status": STATUSES[i % len(STATUSES)]},
+    )
+    drifted = drift_totals()
+    with Session(engine) as session:
+        backfill(session)
+
+    start = time.perf_counter()
+    loaded = await load_everything()
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    checked, mismatched = await reconcile(False, batch_size)
+    check_seconds = time.perf_counter() - start
+
+    await reconcile(True, batch_size)
+    fixed_sales = daily_sales()
+    with Session(engine) as session:
+        backfill(session)
+    _, after_fix = await reconcile(False, batch_size)
+
+    headers = auth_headers(user)
+    paged = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        params = {"limit": max(1, order_count // 3)}
+        while True:
+            response = await client.post(
+                "/reports/reconcile", params=params, headers=headers
+            )
+            response.raise_for_status()
+            report = response.json()
+            paged += report["checked"]
+            if report["next_after"] is None:
+                break
+            params["after"] = report["next_after"]
+
+    print(f"orders={order_count} items={order_count * items_per_order}")
+    print(f"load every order      {load_seconds:7.2f}s  {len(loaded)} mismatched")
+    print(f"reconcile (set-based) {check_seconds:7.2f}s  {mismatched} mismatched")
+    checks = [
+        ("loading everything finds the drifted orders", loaded == drifted),
+        ("every order is checked", checked == order_count),
+        ("the drifted orders are reported", mismatched == len(drifted)),
+        ("--fix leaves no mismatches", after_fix == 0),
+        ("--fix keeps revenue equal to a rebuild", fixed_sales == daily_sales()),
+        ("the endpoint pages through every order", paged == order_count),
+    ]
+    failed = False
+    for description, ok in checks:
+        failed = failed or not ok
+        print(f"{'ok' if ok else 'FAIL':4} {description}")
+    await async_engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.orders, args.items, args.batch_size)))
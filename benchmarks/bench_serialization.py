@@ -0,0 +1,90 @@
+"""
+Encode time per 1k orders (with their items) for the order listing response:
+FastAPI's response_model path (validate from attributes, then dump JSON),
+the older jsonable_encoder + json.dumps path, and the direct ORM-to-orjson
+path used by the listing endpoints.
+
+Usage: python -m benchmarks.bench_serialization [--orders 1000] [--items 3]
+"""
+
+import argparse
+import json
+import time
+from uuid import uuid4
+
+from benchmarks.common import configure_sqlite
+
+configure_sqlite("serialization")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from database.conn import Items, Orders
+from schemas.schemas import OrderPage
+from utils.serialization import ORJSONResponse, order_to_dict
+
+page_adapter = TypeAdapter(OrderPage)
+
+
+def response_model_path(orders) -> bytes:
+    page = page_adapter.validate_python(
+        {"orders": orders, "next_cursor": None}, from_attributes=True
+    )
+    return page_adapter.dump_json(page)
+
+
+def jsonable_encoder_path(orders) -> bytes:
+    page = page_adapter.validate_python(
+        {"orders": orders, "next_cursor": None}, from_attributes=True
+    )
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+def direct_orjson_path(orders) -> bytes:
+    return ORJSONResponse(
+        {"orders": [order_to_dict(order) for order in orders], "next_cursor": None}
+    ).body
+
+
+def build_orders(count: int, items: int) -> list[Orders]:
+    orders = []
+    for _ in range(count):
+        order = Orders(user_uid=uuid4(), total=9.5 * items)
+        order.items = [
+            Items(
+                product_id=1, size_id=1, quantity=1, unit_price=9.5, order_uid=order.uid
+            )
+            for _ in range(items)
+        ]
+        orders.append(order)
+    return orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    orders = build_orders(args.orders, args.items)
+
+    # All paths must produce the same document
+    assert json.loads(direct_orjson_path(orders)) == json.loads(
+        response_model_path(orders)
+    )
+
+    print(f"orders={args.orders} items per order={args.items}")
+    baseline = None
+    for encode in (response_model_path, jsonable_encoder_path, direct_orjson_path):
+        encode(orders)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            encode(orders)
+        per_1k = (time.perf_counter() - start) / args.repeat * 1000 / args.orders * 1000
+        baseline = baseline or per_1k
+        print(
+            f"{encode.__name__:22} {per_1k:8.2f} ms per 1k orders ({baseline / per_1k:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
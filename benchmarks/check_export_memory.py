@@ -0,0 +1,112 @@
+"""
+Streams GET /orders/export for a small and a ten times larger table and fails
+when peak memory grows with the table, i.e. when the export stops streaming.
+The app is driven over raw ASGI so response chunks are discarded as they
+arrive instead of being buffered by a test client.
+
+Usage: python -m benchmarks.check_export_memory [--orders 1000] [--items 3]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import (
+    auth_headers,
+    configure_sqlite,
+    seed_admin,
+    seed_catalog,
+    seed_orders,
+)
+
+configure_sqlite("export_memory")
+
+from database.conn import create_db_and_tables
+from main import app
+
+
+async def export(path: str, headers: dict) -> tuple[int, float, int]:
+    """Return response bytes, seconds and peak traced memory for one export."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("check", 80),
+    }
+    received = 0
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"export returned {message['status']}")
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    return received, elapsed, tracemalloc.get_traced_memory()[1]
+
+
+async def main(order_count: int, item_count: int) -> int:
+    create_db_and_tables()
+    catalog = seed_catalog()
+    user = seed_admin()
+    headers = auth_headers(user)
+
+    tracemalloc.start()
+    await export("/orders/export", headers)  # warm up imports and caches
+    peaks = {"ndjson": [], "csv": []}
+    seeded = 0
+    for orders in (order_count, order_count * 10):
+        seed_orders(user, orders - seeded, catalog, items_per_order=item_count)
+        seeded = orders
+        for fmt, fmt_peaks in peaks.items():
+            size, elapsed, peak = await export(f"/orders/export?format={fmt}", headers)
+            fmt_peaks.append(peak)
+            print(
+                f"{fmt:6} orders={orders:7} {size / 1e6:7.1f} MB streamed "
+                f"in {elapsed:5.2f}s, peak {peak / 1e6:6.2f} MB"
+            )
+
+    failed = False
+    for fmt, (small, large) in peaks.items():
+        if large > 2 * small:
+            print(f"FAIL   {fmt} export memory grows with the table")
+            failed = True
+    tracemalloc.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.orders, args.items)))
@@ -0,0 +1,67 @@
+"""
+Fails when an order listing issues more SQL statements as the number of
+orders grows, i.e. when item loading has regressed to one query per order.
+
+Usage: python -m benchmarks.check_query_counts
+"""
+
+import asyncio
+import sys
+
+from benchmarks.common import (
+    auth_headers,
+    configure_sqlite,
+    seed_admin,
+    seed_catalog,
+    seed_orders,
+)
+
+configure_sqlite("query_counts")
+
+import httpx
+from database.conn import create_db_and_tables
+from database.instrumentation import track_queries
+from main import app
+
+# Each endpoint is measured after seeding each number of orders
+ENDPOINTS = ["/orders/?limit=100", "/orders/user-orders"]
+SIZES = [2, 20]
+
+
+async def count_statements(client: httpx.AsyncClient, path: str, headers: dict) -> int:
+    with track_queries() as stats:
+        response = await client.get(path, headers=headers)
+    response.raise_for_status()
+    return stats.count
+
+
+async def main() -> int:
+    create_db_and_tables()
+    catalog = seed_catalog()
+    user = seed_admin()
+    headers = auth_headers(user)
+
+    counts = {path: [] for path in ENDPOINTS}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://check"
+    ) as client:
+        seeded = 0
+        for size in SIZES:
+            seed_orders(user, size - seeded, catalog, items_per_order=2)
+            seeded = size
+            for path in ENDPOINTS:
+                await client.get(path, headers=headers)  # warm the user cache
+                counts[path].append(await count_statements(client, path, headers))
+
+    failed = False
+    for path, per_size in counts.items():
+        status = "ok" if len(set(per_size)) == 1 else "N+1"
+        failed = failed or status != "ok"
+        detail = ", ".join(f"{n} orders: {c}" for n, c in zip(SIZES, per_size))
+        print(f"{status:4} {path:24} statements ({detail})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
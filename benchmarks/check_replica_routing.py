@@ -0,0 +1,106 @@
+"""
+Checks read/write routing with two SQLite files standing in for a primary
+and a read replica. Nothing replicates between them, so the data a listing
+returns shows which database served it: reads go to the replica, except for
+a user who just wrote, who reads the primary until the stickiness window
+passes. Another worker, which did not see the write, must honour the client's
+write marker cookie, and a tampered marker must be ignored.
+
+Usage: python -m benchmarks.check_replica_routing
+"""
+
+import asyncio
+import os
+import sys
+from uuid import uuid4
+
+from benchmarks.common import auth_headers, configure_sqlite
+
+primary_path = configure_sqlite("primary")
+replica_path = os.path.join(os.path.dirname(primary_path), "replica.db")
+os.environ["READ_REPLICA_URLS"] = f"sqlite:///{replica_path}"
+os.environ["READ_YOUR_WRITES_SECONDS"] = "0.5"
+
+import httpx
+from sqlmodel import Session, SQLModel, create_engine
+from database.conn import Orders, Users, create_db_and_tables, engine
+from database.replicas import WRITE_COOKIE, replica_router
+from main import app
+
+
+async def listed_order_uids(client: httpx.AsyncClient, headers: dict) -> set[str]:
+    response = await client.get("/orders/user-orders", headers=headers)
+    response.raise_for_status()
+    return {order["uid"] for order in response.json()["orders"]}
+
+
+async def main() -> int:
+    create_db_and_tables()
+    replica = create_engine(f"sqlite:///{replica_path}")
+    SQLModel.metadata.create_all(replica)
+
+    def make_user() -> Users:
+        return Users(
+            uid=user_uid,
+            name="admin",
+            email="admin@example.com",
+            password="x",
+            admin=True,
+        )
+
+    user_uid = uuid4()
+    replica_order = Orders(user_uid=user_uid)
+    with Session(engine) as session:
+        session.add(make_user())
+        session.commit()
+    with Session(replica) as session:
+        session.add_all([make_user(), replica_order])
+        session.commit()
+        session.refresh(replica_order)
+    user = make_user()
+    headers = auth_headers(user)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://check"
+    ) as client:
+        before_write = await listed_order_uids(client, headers)
+        response = await client.post(
+            "/orders/", json={"user_uid": str(user.uid)}, headers=headers
+        )
+        response.raise_for_status()
+        primary_order = response.json()["uid"]
+        after_write = await listed_order_uids(client, headers)
+        # Another worker only knows about the write through the cookie
+        replica_router._recent_writers.clear()
+        other_worker = await listed_order_uids(client, headers)
+        marker = client.cookies[WRITE_COOKIE]
+        client.cookies.set(
+            WRITE_COOKIE, marker[:-1] + ("0" if marker[-1] != "0" else "1")
+        )
+        tampered = await listed_order_uids(client, headers)
+        client.cookies.set(WRITE_COOKIE, marker)
+        await asyncio.sleep(0.6)
+        after_window = await listed_order_uids(client, headers)
+
+    checks = [
+        ("read before writing uses the replica", before_write, str(replica_order.uid)),
+        ("read after writing uses the primary", after_write, primary_order),
+        ("another worker honours the write cookie", other_worker, primary_order),
+        ("a tampered write cookie is ignored", tampered, str(replica_order.uid)),
+        (
+            "read after the window uses the replica",
+            after_window,
+            str(replica_order.uid),
+        ),
+    ]
+    failed = False
+    for description, seen, expected in checks:
+        ok = seen == {expected}
+        failed = failed or not ok
+        print(f"{'ok' if ok else 'FAIL':4} {description}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,125 @@
+"""
+Checks token revocation: logout revokes the access and refresh tokens it is
+given, refresh tokens work only once (also when used concurrently) and are
+not interchangeable with access tokens, another worker picks up a revocation
+from the database, and revoked ids are dropped once their token expires.
+Checking a token that was never revoked must not touch the database.
+
+Usage: python -m benchmarks.check_token_revocation
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import configure_sqlite
+
+configure_sqlite("revocation")
+# Short enough for the check to wait one interval for another worker to sync
+SYNC_INTERVAL = 0.5
+
+import httpx
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import async_engine, create_db_and_tables
+from main import app
+from security.revocation import RevocationList, revoked_tokens
+
+
+async def sign_in(client: httpx.AsyncClient, email: str) -> tuple[str, str]:
+    response = await client.post(
+        "/auth/token", data={"username": email, "password": "password1"}
+    )
+    response.raise_for_status()
+    body = response.json()
+    return body["access_token"], body["refresh_token"]["access_token"]
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def main() -> int:
+    create_db_and_tables()
+    revoked_tokens.sync_interval = SYNC_INTERVAL
+    checks = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://check"
+    ) as client:
+        email = "revoke@example.com"
+        response = await client.post(
+            "/auth/signup",
+            json={"name": "revoke", "email": email, "password": "password1"},
+        )
+        response.raise_for_status()
+        order = {"user_uid": response.json()["user_id"]}
+
+        access, refresh = await sign_in(client, email)
+        before = await client.post("/orders/", json=order, headers=bearer(access))
+        checks.append(("access token works before logout", before.status_code, 200))
+        response = await client.post(
+            "/auth/logout", json={"refresh_token": refresh}, headers=bearer(access)
+        )
+        checks.append(("logout succeeds", response.status_code, 200))
+        after = await client.post("/orders/", json=order, headers=bearer(access))
+        checks.append(("access token rejected after logout", after.status_code, 401))
+        after = await client.get("/auth/refresh", headers=bearer(refresh))
+        checks.append(("refresh token rejected after logout", after.status_code, 401))
+
+        _, refresh = await sign_in(client, email)
+        first = await client.get("/auth/refresh", headers=bearer(refresh))
+        checks.append(("refresh token works once", first.status_code, 200))
+        second = await client.get("/auth/refresh", headers=bearer(refresh))
+        checks.append(("refresh token rejected on reuse", second.status_code, 401))
+
+        access, refresh = await sign_in(client, email)
+        response = await client.get("/auth/refresh", headers=bearer(access))
+        checks.append(("access token rejected by refresh", response.status_code, 401))
+        response = await client.post("/orders/", json=order, headers=bearer(refresh))
+        checks.append(("refresh token rejected as access", response.status_code, 401))
+        responses = await asyncio.gather(
+            *(client.get("/auth/refresh", headers=bearer(refresh)) for _ in range(5))
+        )
+        codes = sorted(response.status_code for response in responses)
+        checks.append(("concurrent refreshes succeed once", codes, [200] + [401] * 4))
+
+        access, _ = await sign_in(client, email)
+        async with AsyncSession(async_engine) as session:
+            other_worker = RevocationList(sync_interval=SYNC_INTERVAL)
+            await other_worker.refresh(session)
+            # Logout through this worker, then let the other one sync
+            await client.post("/auth/logout", headers=bearer(access))
+            await asyncio.sleep(SYNC_INTERVAL)
+            jtis = list(revoked_tokens._expiries)
+            seen = all([await other_worker.is_revoked(session, jti) for jti in jtis])
+            checks.append(("another worker sees revocations", seen, True))
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+            for _ in range(1000):
+                await other_worker.is_revoked(session, "never-revoked")
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+            checks.append(
+                ("lookups between syncs skip the database", len(statements), 0)
+            )
+
+    expiring = RevocationList(sync_interval=SYNC_INTERVAL)
+    expiring.add("soon", datetime.now(timezone.utc) + timedelta(seconds=0.2))
+    expiring.add("later", datetime.now(timezone.utc) + timedelta(hours=1))
+    time.sleep(0.3)
+    expiring.evict()
+    checks.append(("expired ids are evicted", sorted(expiring._expiries), ["later"]))
+
+    failed = False
+    for description, seen, expected in checks:
+        ok = seen == expected
+        failed = failed or not ok
+        print(f"{'ok' if ok else 'FAIL':4} {description} ({seen})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
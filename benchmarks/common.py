@@ -0,0 +1,123 @@
+import os
+import tempfile
+
+
+def configure_sqlite(name: str) -> str:
+    """
+    Point the application settings at a throwaway SQLite database.
+    Must be called before importing any module that reads utils.settings.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="pizza-bench-"), f"{name}.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["SECRET_KEY"] = "benchmark-secret-key-benchmark-secret-key"
+    os.environ["ALGORITHM"] = "HS256"
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    # Benchmarks drive one client far past any per-client budget
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    return path
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (0 when empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def seed_catalog() -> list[tuple[int, int, float]]:
+    """
+    Create a small catalog and return (product_id, size_id, unit_price) for
+    each price. The app is imported here because configure_sqlite must run
+    before it is loaded.
+    """
+    from sqlmodel import Session
+    from database.conn import CatalogVersion, Prices, Products, Sizes, engine
+
+    with Session(engine) as session:
+        products = [
+            Products(name="pizza", flavor="margherita"),
+            Products(name="pizza", flavor="pepperoni"),
+            Products(name="soda"),
+        ]
+        sizes = [Sizes(name="M"), Sizes(name="L")]
+        session.add_all([*products, *sizes, CatalogVersion()])
+        session.flush()
+        prices = [
+            Prices(product_id=product.id, size_id=size.id, unit_price=price)
+            for product, size, price in [
+                (products[0], sizes[0], 9.5),
+                (products[0], sizes[1], 12.0),
+                (products[1], sizes[0], 10.5),
+                (products[1], sizes[1], 13.25),
+                (products[2], sizes[0], 2.5),
+            ]
+        ]
+        session.add_all(prices)
+        session.commit()
+        return [(p.product_id, p.size_id, p.unit_price) for p in prices]
+
+
+def seed_admin():
+    """Create the admin user every benchmark signs in as, detached from its session."""
+    from sqlmodel import Session
+    from database.conn import Users, engine
+
+    user = Users(name="admin", email="admin@example.com", password="x", admin=True)
+    with Session(engine) as session:
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+    return user
+
+
+def auth_headers(user) -> dict:
+    """Authorization header with an access token carrying `user`'s claims."""
+    from security.security import create_access_token, token_claims
+
+    return {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+
+
+def seed_orders(
+    user,
+    count: int,
+    catalog: list,
+    items_per_order: int = 1,
+    order_fields=None,
+    batch_size: int = 500,
+):
+    """
+    Insert `count` orders for `user` with `items_per_order` items each, in
+    multi-row INSERTs of `batch_size` orders. Item j of order i has the
+    catalog price (i + j) % len(catalog) and quantity 1 + (i + j) % 3, and
+    every total matches its items. `order_fields(i)`, when given, returns
+    extra Orders fields for order i, such as its status or created_at.
+    """
+    from sqlmodel import Session, insert
+    from database.conn import Items, Orders, engine
+
+    with Session(engine) as session:
+        for offset in range(0, count, batch_size):
+            orders, items = [], []
+            for i in range(offset, min(offset + batch_size, count)):
+                fields = order_fields(i) if order_fields else {}
+                order = Orders(user_uid=user.uid, **fields)
+                for j in range(items_per_order):
+                    product_id, size_id, unit_price = catalog[(i + j) % len(catalog)]
+                    quantity = 1 + (i + j) % 3
+                    items.append(
+                        {"product_id": product_id, "size_id": size_id}
+                        | {"quantity": quantity, "unit_price": unit_price}
+                        | {"order_uid": order.uid}
+                    )
+                    order.total += quantity * unit_price
+                orders.append(order)
+            session.exec(
+                insert(Orders).values([order.model_dump() for order in orders])
+            )
+            if items:
+                session.exec(insert(Items).values(items))
+        session.commit()
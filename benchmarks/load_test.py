@@ -0,0 +1,212 @@
+"""
+In-process load test of the full order lifecycle: each virtual user signs up,
+gets a token, creates orders, adds items one by one and in a batch, lists
+its orders, completes or cancels them, and lists all orders.
+
+Reports throughput and p50/p95/p99 latency per endpoint. Use --save to keep
+the results as JSON and --compare to diff a run against saved results.
+
+Usage: python -m benchmarks.load_test [--users 20] [--concurrency 10]
+           [--orders 3] [--save results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.common import configure_sqlite, percentile, seed_catalog
+
+configure_sqlite("load_test")
+
+import httpx
+from sqlmodel import Session, select
+from database.conn import Users, create_db_and_tables, engine
+from main import app
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint label."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+
+def promote_to_admin(email: str):
+    # Most order routes require an admin who owns the order
+    with Session(engine) as session:
+        user = session.exec(select(Users).where(Users.email == email)).one()
+        user.admin = True
+        session.add(user)
+        session.commit()
+
+
+async def virtual_user(
+    client, recorder: Recorder, index: int, orders: int, catalog: list, rng
+):
+    email = f"user{index}@example.com"
+    password = "pizza1234"
+    await recorder.request(
+        client,
+        "POST /auth/signup",
+        "POST",
+        "/auth/signup",
+        json={"name": f"user{index}", "email": email, "password": password},
+    )
+    await asyncio.to_thread(promote_to_admin, email)
+    response = await recorder.request(
+        client,
+        "POST /auth/token",
+        "POST",
+        "/auth/token",
+        data={"username": email, "password": password},
+    )
+    token = response.json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    user_uid = token["data"]["user_id"]
+
+    (pizza, medium, _), (_, large, _) = catalog[0], catalog[1]
+    soda, soda_size, _ = catalog[-1]
+    for _ in range(orders):
+        response = await recorder.request(
+            client,
+            "POST /orders/",
+            "POST",
+            "/orders/",
+            json={"user_uid": user_uid},
+            headers=headers,
+        )
+        order_id = response.json()["uid"]
+        for _ in range(2):
+            await recorder.request(
+                client,
+                "POST /orders/add-item/{order_id}",
+                "POST",
+                f"/orders/add-item/{order_id}",
+                json={"product_id": pizza, "size_id": medium, "quantity": 1},
+                headers=headers,
+            )
+        await recorder.request(
+            client,
+            "POST /orders/add-items/{order_id}",
+            "POST",
+            f"/orders/add-items/{order_id}",
+            json=[
+                {"product_id": pizza, "size_id": large, "quantity": 2},
+                {"product_id": soda, "size_id": soda_size, "quantity": 3},
+            ],
+            headers=headers,
+        )
+        await recorder.request(
+            client,
+            "GET /orders/user-orders",
+            "GET",
+            "/orders/user-orders",
+            headers=headers,
+        )
+        if rng.random() < 0.8:
+            await recorder.request(
+                client,
+                "POST /orders/complete/{order_id}",
+                "POST",
+                f"/orders/complete/{order_id}",
+                headers=headers,
+            )
+        else:
+            await recorder.request(
+                client,
+                "GET /orders/cancel/{order_id}",
+                "GET",
+                f"/orders/cancel/{order_id}",
+                headers=headers,
+            )
+    await recorder.request(client, "GET /orders/", "GET", "/orders/", headers=headers)
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    results = {}
+    for label, samples in recorder.samples.items():
+        results[label] = {
+            "requests": len(samples),
+            "errors": recorder.errors[label],
+            "throughput_rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+    return results
+
+
+def print_report(results: dict, baseline: dict | None):
+    header = f"{'endpoint':36} {'reqs':>5} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    for label, row in sorted(results.items()):
+        print(
+            f"{label:36} {row['requests']:5d} {row['errors']:4d} "
+            f"{row['throughput_rps']:8.1f} {row['p50_ms']:8.2f} "
+            f"{row['p95_ms']:8.2f} {row['p99_ms']:8.2f}"
+        )
+        previous = (baseline or {}).get(label)
+        if previous:
+            deltas = " ".join(
+                f"{key}={(row[key] - previous[key]) / previous[key] * 100:+.1f}%"
+                for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+                if previous[key]
+            )
+            print(f"{'':36} vs baseline: {deltas}")
+
+
+async def main(args) -> int:
+    create_db_and_tables()
+    catalog = seed_catalog()
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load", timeout=60
+    ) as client:
+
+        async def run_user(index: int):
+            async with semaphore:
+                await virtual_user(client, recorder, index, args.orders, catalog, rng)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_user(i) for i in range(args.users)))
+        elapsed = time.perf_counter() - start
+
+    results = summarize(recorder, elapsed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["endpoints"]
+    print(f"users={args.users} concurrency={args.concurrency} elapsed={elapsed:.2f}s")
+    print_report(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "endpoints": results}, f, indent=2)
+    return 1 if any(recorder.errors.values()) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--orders", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,122 @@
+"""
+Fires concurrent item adds, batch adds and removes (including duplicate
+removals of the same item) at one order, then checks that Orders.total equals
+the sum of its remaining items. Exits non-zero if they drift.
+
+Usage: python -m benchmarks.stress_order_totals [--adds 200] [--removes 50]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+
+from benchmarks.common import auth_headers, configure_sqlite, seed_admin, seed_catalog
+
+configure_sqlite("order_totals")
+
+import httpx
+from sqlmodel import Session, func, select
+from database.conn import (
+    Items,
+    Orders,
+    Users,
+    create_db_and_tables,
+    engine,
+)
+from main import app
+
+
+def seed(user: Users, removes: int, catalog: list) -> tuple[Orders, list[str]]:
+    product_id, size_id, unit_price = catalog[0]
+    with Session(engine) as session:
+        order = Orders(user_uid=user.uid)
+        items = [
+            Items(
+                product_id=product_id,
+                size_id=size_id,
+                quantity=2,
+                unit_price=unit_price,
+                order=order,
+            )
+            for _ in range(removes)
+        ]
+        order.total = sum(item.unit_price * item.quantity for item in items)
+        session.add_all([order, *items])
+        session.commit()
+        session.refresh(order)
+        session.expunge(order)
+        return order, [str(item.uid) for item in items]
+
+
+async def main(adds: int, removes: int, concurrency: int) -> int:
+    create_db_and_tables()
+    catalog = seed_catalog()
+    user = seed_admin()
+    order, item_ids = seed(user, removes, catalog)
+    headers = auth_headers(user)
+    semaphore = asyncio.Semaphore(concurrency)
+    rng = random.Random(42)
+
+    async def send(method: str, path: str, **kwargs) -> int:
+        async with semaphore:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            return response.status_code
+
+    requests = []
+    for _ in range(adds):
+        product_id, size_id, _ = rng.choice(catalog)
+        item = {"product_id": product_id, "size_id": size_id}
+        item["quantity"] = rng.randint(1, 4)
+        if rng.random() < 0.2:
+            requests.append(("POST", f"/orders/add-items/{order.uid}", [item, item]))
+        else:
+            requests.append(("POST", f"/orders/add-item/{order.uid}", item))
+    for item_id in item_ids:
+        for _ in range(2):  # the second removal must not subtract again
+            requests.append(
+                ("DELETE", f"/orders/remove-item/{item_id}", {"item_uid": item_id})
+            )
+    rng.shuffle(requests)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://stress"
+    ) as client:
+        statuses = await asyncio.gather(
+            *(
+                (
+                    send(method, path, params=body)
+                    if method == "DELETE"
+                    else send(method, path, json=body)
+                )
+                for method, path, body in requests
+            )
+        )
+
+    with Session(engine) as session:
+        total = session.get(Orders, order.uid).total
+        expected = session.exec(
+            select(
+                func.coalesce(func.sum(Items.unit_price * Items.quantity), 0.0)
+            ).where(Items.order_uid == order.uid)
+        ).one()
+
+    print(f"requests={len(requests)} concurrency={concurrency}")
+    for code in sorted(set(statuses)):
+        print(f"  HTTP {code}: {statuses.count(code)}")
+    print(f"Orders.total={total:.2f} sum(items)={expected:.2f}")
+    if abs(total - expected) > 1e-6:
+        print("FAIL: order total drifted from its items")
+        return 1
+    print("ok")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--adds", type=int, default=200)
+    parser.add_argument("--removes", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.adds, args.removes, args.concurrency)))
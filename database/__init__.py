@@ -1,3 +1,3 @@
-from database import conn
+from database import conn, instrumentation
 
-__all__ = ["conn"]
+__all__ = ["conn", "instrumentation"]
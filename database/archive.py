@@ -0,0 +1,89 @@
+"""
+Moves finalized orders out of the hot orders and items tables.
+
+COMPLETED and CANCELLED orders placed more than ARCHIVE_AFTER_DAYS ago are
+copied with their items into archivedorders/archiveditems and deleted from
+the hot tables, ARCHIVE_BATCH_SIZE orders per transaction so locks are held
+briefly. Run it periodically:
+
+    python -m database.archive [--days 90] [--batch-size 500]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import literal
+from sqlmodel import Session, delete, insert, select
+from database.conn import (
+    ArchivedItems,
+    ArchivedOrders,
+    Items,
+    MyStatus,
+    Orders,
+    engine,
+    utc_now,
+)
+from utils.settings import settings
+
+ORDER_COLUMNS = [column.name for column in Orders.__table__.columns]
+ITEM_COLUMNS = [column.name for column in Items.__table__.columns]
+
+
+def archive_batch(session: Session, cutoff: datetime, batch_size: int) -> int:
+    """Archive up to `batch_size` orders in one transaction; return how many."""
+    uids = session.exec(
+        select(Orders.uid)
+        .where(
+            Orders.status.in_([MyStatus.COMPLETED, MyStatus.CANCELLED]),
+            Orders.created_at < cutoff,
+        )
+        .order_by(Orders.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not uids:
+        return 0
+    archived_at = literal(utc_now(), ArchivedOrders.__table__.c.archived_at.type)
+    session.exec(
+        insert(ArchivedOrders).from_select(
+            ORDER_COLUMNS + ["archived_at"],
+            select(
+                *(getattr(Orders, name) for name in ORDER_COLUMNS), archived_at
+            ).where(Orders.uid.in_(uids)),
+        )
+    )
+    session.exec(
+        insert(ArchivedItems).from_select(
+            ITEM_COLUMNS,
+            select(*(getattr(Items, name) for name in ITEM_COLUMNS)).where(
+                Items.order_uid.in_(uids)
+            ),
+        )
+    )
+    session.exec(delete(Items).where(Items.order_uid.in_(uids)))
+    session.exec(delete(Orders).where(Orders.uid.in_(uids)))
+    session.commit()
+    return len(uids)
+
+
+def archive_orders(
+    older_than: timedelta = timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Archive every eligible order, batch by batch; return how many moved."""
+    cutoff = utc_now() - older_than
+    moved = 0
+    with Session(engine) as session:
+        while True:
+            count = archive_batch(session, cutoff, batch_size)
+            moved += count
+            if count < batch_size:
+                return moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=float, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    moved = archive_orders(timedelta(days=args.days), args.batch_size)
+    print(f"archived {moved} orders")
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import CatalogVersion, Prices, Products, Sizes
+from utils.settings import settings
+
+
+class CatalogCache:
+    """
+    In-process copy of the product catalog, so pricing an item is a dict
+    lookup. The stored catalog version is re-read at most every
+    `check_interval` seconds and the catalog reloaded only when it changed;
+    changes made through this process invalidate it right away. Only one
+    request re-checks at a time; the others keep pricing from the current
+    copy instead of each holding a connection for the same queries.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self.version: int | None = None
+        self.products: dict[int, Products] = {}
+        self.sizes: dict[int, Sizes] = {}
+        self.prices: dict[tuple[int, int], float] = {}
+        self._checked_at = 0.0
+        self._loading = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> "CatalogCache":
+        """Return the cache, first reloading it if it may be out of date."""
+        if self.version is None:
+            # Nothing to price from yet, so the others wait for the first load
+            async with self._loading:
+                if self.version is None:
+                    await self.refresh(db)
+                    self._checked_at = time.monotonic()
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            # Claimed before the queries, so an invalidate() meanwhile still counts
+            self._checked_at = time.monotonic()
+            try:
+                await self.refresh(db)
+            except Exception:
+                self._checked_at = 0.0
+                raise
+        return self
+
+    async def refresh(self, db: AsyncSession):
+        version = (await db.exec(select(CatalogVersion.version))).first() or 0
+        if version != self.version:
+            products = (await db.exec(select(Products))).all()
+            sizes = (await db.exec(select(Sizes))).all()
+            prices = (await db.exec(select(Prices))).all()
+            self.products = {product.id: product for product in products}
+            self.sizes = {size.id: size for size in sizes}
+            self.prices = {
+                (price.product_id, price.size_id): price.unit_price for price in prices
+            }
+            self.version = version
+
+    def price(self, product_id: int, size_id: int) -> float | None:
+        return self.prices.get((product_id, size_id))
+
+    def invalidate(self):
+        """Re-check the stored version on the next get."""
+        self._checked_at = 0.0
+
+
+async def bump_catalog_version(db: AsyncSession):
+    """Mark the catalog as changed; call in the transaction that changes it."""
+    result = await db.exec(
+        update(CatalogVersion).values(version=CatalogVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(CatalogVersion())
+
+
+catalog = CatalogCache(check_interval=settings.CATALOG_CHECK_INTERVAL)
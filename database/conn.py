@@ -1,10 +1,26 @@
 from sqlmodel import SQLModel, create_engine, Session, Field, Relationship
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy.ext.asyncio import create_async_engine
+from database.pool import TimedAsyncQueuePool, TimedQueuePool
 from utils.settings import settings
 from uuid import uuid4, UUID
 from enum import Enum
+from datetime import date, datetime, timezone
 
+POOL_OPTIONS = {
+    "echo": settings.DB_ECHO,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **POOL_OPTIONS)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL, poolclass=TimedAsyncQueuePool, **POOL_OPTIONS
+)
 
 
 def create_db_and_tables():
@@ -16,6 +32,17 @@ def get_session():
         yield session
 
 
+async def get_async_session():
+    # expire_on_commit=False keeps loaded attributes usable after commit,
+    # since lazy reloads are not allowed outside the async context
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 # Models for SQLModel
 
 
@@ -29,21 +56,55 @@ class Users(SQLModel, table=True):
     )
     active: bool = Field(default=True)
     admin: bool = Field(default=False)
+    token_version: int = Field(default=0)
 
     orders: list["Orders"] = Relationship(back_populates="user")
 
 
+# Ids (jti) of revoked tokens, kept until the token expires (see security.revocation)
+class RevokedTokens(SQLModel, table=True):
+    jti: str = Field(primary_key=True, max_length=64)
+    expires_at: datetime = Field(index=True)
+    revoked_at: datetime = Field(default_factory=utc_now, index=True)
+
+
+# Catalog models; item prices are looked up in them (see database.catalog)
+class Products(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("name", "flavor"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    name: str
+    flavor: str = Field(default="")
+
+
+class Sizes(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    name: str = Field(unique=True)
+
+
+class Prices(SQLModel, table=True):
+    product_id: int = Field(foreign_key="products.id", primary_key=True)
+    size_id: int = Field(foreign_key="sizes.id", primary_key=True)
+    unit_price: float
+
+
+class CatalogVersion(SQLModel, table=True):
+    # Single row, bumped with every catalog change so caches know to reload
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=1)
+
+
 # Item model
 class Items(SQLModel, table=True):
     uid: UUID = Field(default_factory=uuid4, primary_key=True)
-    name: str
+    product_id: int = Field(foreign_key="products.id")
+    size_id: int = Field(foreign_key="sizes.id")
     quantity: int = Field(default=0)
-    flavor: str = Field(default="")
-    size: str = Field(default="")
+    # Catalog price when the item was added; later price changes keep old totals
     unit_price: float = Field(default=0.0)
-    order_uid: UUID = Field(foreign_key="orders.uid")
+    order_uid: UUID = Field(foreign_key="orders.uid", index=True)
 
-    order: Orders = Relationship(back_populates="items")
+    order: "Orders" = Relationship(back_populates="items")
 
 
 # Status Enum for Order
@@ -55,10 +116,76 @@ class MyStatus(str, Enum):
 
 # Order model
 class Orders(SQLModel, table=True):
+    # Composite indexes backing keyset pagination on (created_at, uid)
+    __table_args__ = (
+        Index("ix_orders_created_at_uid", "created_at", "uid"),
+        Index("ix_orders_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+    )
+
     uid: UUID = Field(default_factory=uuid4, primary_key=True)
-    status: MyStatus = Field(default=MyStatus.PENDING)
+    # Indexed so pending orders can be counted without a scan (see database.rollups)
+    status: MyStatus = Field(default=MyStatus.PENDING, index=True)
     user_uid: UUID = Field(foreign_key="users.uid")
     total: float = Field(default=0.0)
+    created_at: datetime = Field(default_factory=utc_now)
+    # Bumped in SQL on every change to the order or its items; backs ETags
+    version: int = Field(default=1)
 
     user: Users = Relationship(back_populates="orders")
     items: list["Items"] = Relationship(back_populates="order", cascade_delete=True)
+
+
+# Archive of finalized orders moved out of the hot tables (see database.archive)
+class ArchivedOrders(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_archivedorders_created_at_uid", "created_at", "uid"),
+        Index(
+            "ix_archivedorders_user_uid_created_at_uid",
+            "user_uid",
+            "created_at",
+            "uid",
+        ),
+    )
+
+    uid: UUID = Field(primary_key=True)
+    status: MyStatus
+    user_uid: UUID = Field(foreign_key="users.uid")
+    total: float
+    created_at: datetime
+    version: int
+    archived_at: datetime = Field(default_factory=utc_now)
+
+    items: list["ArchivedItems"] = Relationship(back_populates="order")
+
+
+class ArchivedItems(SQLModel, table=True):
+    uid: UUID = Field(primary_key=True)
+    product_id: int = Field(foreign_key="products.id")
+    size_id: int = Field(foreign_key="sizes.id")
+    quantity: int
+    unit_price: float
+    order_uid: UUID = Field(foreign_key="archivedorders.uid", index=True)
+
+    order: ArchivedOrders = Relationship(back_populates="items")
+
+
+# Sales rollups, kept current by order status changes (see database.rollups)
+class DailySales(SQLModel, table=True):
+    # Completed orders and their revenue by the day they were placed
+    day: date = Field(primary_key=True)
+    orders: int = Field(default=0)
+    revenue: float = Field(default=0.0)
+
+
+class StatusCounts(SQLModel, table=True):
+    # Finalized orders only; pending ones are counted from the orders table
+    status: MyStatus = Field(primary_key=True)
+    orders: int = Field(default=0)
+
+
+class ItemSales(SQLModel, table=True):
+    # Quantity and revenue of items in completed orders
+    product_id: int = Field(foreign_key="products.id", primary_key=True)
+    size_id: int = Field(foreign_key="sizes.id", primary_key=True)
+    quantity: int = Field(default=0)
+    revenue: float = Field(default=0.0)
@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import async_engine
+from utils.settings import settings
+
+
+class GroupCommitQueue:
+    """
+    Collects new rows from concurrent requests and inserts them in shared
+    transactions, so a burst pays for one commit per batch instead of one per
+    request. A batch is written once it holds `batch_size` rows or its first
+    row has waited `max_wait` seconds, whichever comes first.
+    """
+
+    def __init__(self, engine: AsyncEngine, batch_size: int, max_wait: float):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+
+    async def submit(self, row: SQLModel) -> SQLModel:
+        """Queue `row` for insertion and return it once its batch is committed."""
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            # A fresh context keeps the writer's SQL out of the per-request
+            # query tracking of whichever request happened to start it
+            self._writer = asyncio.get_running_loop().create_task(
+                self._run(), context=contextvars.Context()
+            )
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if entry is None:
+                    await self._flush(batch)
+                    return
+                batch.append(entry)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        try:
+            async with AsyncSession(self.engine, expire_on_commit=False) as session:
+                session.add_all([row for row, _ in batch])
+                await session.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                # Retry one by one so a bad row only fails its own request
+                for entry in batch:
+                    await self._flush([entry])
+                return
+            future = batch[0][1]
+            if not future.done():
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for row, future in batch:
+            if not future.done():
+                future.set_result(row)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.ORDER_INGEST_ENABLED,
+            "batch_size": self.batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": self.rows / self.batches if self.batches else 0.0,
+        }
+
+    async def close(self):
+        """Write whatever is still queued, then stop the writer."""
+        if self._writer is not None and not self._writer.done():
+            self._queue.put_nowait(None)
+            await self._writer
+        self._writer = None
+
+
+order_ingest = GroupCommitQueue(
+    async_engine,
+    batch_size=settings.ORDER_INGEST_BATCH_SIZE,
+    max_wait=settings.ORDER_INGEST_MAX_WAIT_MS / 1000,
+)
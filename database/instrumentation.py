@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Number of SQL statements run and time spent in them for one unit of work."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Every enclosing track_queries() block sees the queries, so a request tracked
+# by the metrics middleware can also be tracked by a benchmark around it
+_active_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    "query_stats", default=()
+)
+
+
+@contextmanager
+def track_queries():
+    """Collect statement count and time for every query run inside the block."""
+    stats = QueryStats()
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if _active_stats.get():
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    active = _active_stats.get()
+    starts = conn.info.get("query_start")
+    if active and starts:
+        elapsed = time.perf_counter() - starts.pop()
+        for stats in active:
+            stats.count += 1
+            stats.seconds += elapsed
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from utils.metrics import LatencyStats
+
+
+class WaitTimingMixin:
+    """Records how long each checkout waits for a pooled connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait = LatencyStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(WaitTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(engine: Engine) -> dict:
+    """Current occupancy and checkout wait time of an engine's pool."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "wait": pool.wait.as_dict(),
+    }
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> int:
+    """
+    Open up to `connections` pooled connections at once and return them to the
+    pool, so the first requests do not pay for connecting. Returns how many
+    were opened.
+    """
+    count = max(0, min(connections, engine.pool.size()))
+
+    async def open_one(stack: AsyncExitStack):
+        connection = await stack.enter_async_context(engine.connect())
+        await connection.execute(text("SELECT 1"))
+
+    # Hold every connection until all are open, otherwise they would reuse one
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(*(open_one(stack) for _ in range(count)))
+    return count
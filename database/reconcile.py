@@ -0,0 +1,202 @@
+"""
+Reconciles order totals with the items they contain.
+
+Orders.total is adjusted incrementally as items are added and removed, so it
+can drift from the sum of its items. Orders are checked RECONCILE_BATCH_SIZE
+at a time in primary key order, each batch with a single aggregate query over
+the items of that key range, so no order or item is loaded into Python unless
+its total is wrong. Mismatches are reported and, with --fix, set to the sum of
+their items:
+
+    python -m database.reconcile [--fix] [--archived] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from uuid import UUID
+from sqlmodel import func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import (
+    ArchivedItems,
+    ArchivedOrders,
+    DailySales,
+    Items,
+    MyStatus,
+    Orders,
+    async_engine,
+)
+from database.rollups import increment
+from schemas.schemas import ReconcileReport, TotalMismatch
+from utils.settings import settings
+
+# Totals within half a cent of their items are not reported
+TOLERANCE = 0.005
+
+
+def mismatch_query(orders_model, items_model, after: UUID | None, upper: UUID | None):
+    """Orders with uid in (after, upper] whose total differs from their items."""
+
+    def in_range(column):
+        bounds = []
+        if after is not None:
+            bounds.append(column > after)
+        if upper is not None:
+            bounds.append(column <= upper)
+        return bounds
+
+    item_totals = (
+        select(
+            items_model.order_uid,
+            func.sum(items_model.quantity * items_model.unit_price).label("total"),
+        )
+        .where(*in_range(items_model.order_uid))
+        .group_by(items_model.order_uid)
+        .subquery("item_totals")
+    )
+    items_total = func.coalesce(item_totals.c.total, 0.0)
+    return (
+        select(
+            orders_model.uid,
+            orders_model.status,
+            orders_model.created_at,
+            orders_model.version,
+            orders_model.total,
+            items_total,
+        )
+        .outerjoin(item_totals, item_totals.c.order_uid == orders_model.uid)
+        .where(
+            *in_range(orders_model.uid),
+            func.abs(orders_model.total - items_total) > TOLERANCE,
+        )
+    )
+
+
+async def fix_totals(db: AsyncSession, orders_model, rows) -> int:
+    """
+    Set each mismatched total to the sum of its items, unless the order has
+    changed since it was checked, and move completed orders' revenue along.
+    """
+    revenue = defaultdict(float)
+    fixed = 0
+    for uid, order_status, created_at, version, total, items_total in rows:
+        result = await db.exec(
+            update(orders_model)
+            .where(orders_model.uid == uid, orders_model.version == version)
+            .values(total=items_total, version=orders_model.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            continue
+        fixed += 1
+        if order_status == MyStatus.COMPLETED:
+            revenue[created_at.date()] += items_total - total
+    if revenue:
+        await db.exec(
+            increment(
+                db.bind.dialect.name,
+                DailySales,
+                [
+                    {"day": day, "orders": 0, "revenue": delta}
+                    for day, delta in revenue.items()
+                ],
+                ["day"],
+            )
+        )
+    return fixed
+
+
+async def reconcile_batch(
+    db: AsyncSession,
+    after: UUID | None,
+    batch_size: int,
+    fix: bool = False,
+    archived: bool = False,
+) -> ReconcileReport:
+    """Check the `batch_size` orders following `after`, in one transaction."""
+    orders_model, items_model = (
+        (ArchivedOrders, ArchivedItems) if archived else (Orders, Items)
+    )
+    after_filter = [orders_model.uid > after] if after is not None else []
+    # The batch's last uid bounds the item aggregate to this batch's orders
+    upper = (
+        await db.exec(
+            select(orders_model.uid)
+            .where(*after_filter)
+            .order_by(orders_model.uid)
+            .offset(batch_size - 1)
+            .limit(1)
+        )
+    ).first()
+    if upper is None:
+        checked = (
+            await db.exec(
+                select(func.count()).where(*after_filter).select_from(orders_model)
+            )
+        ).one()
+    else:
+        checked = batch_size
+    rows = (
+        await db.exec(mismatch_query(orders_model, items_model, after, upper))
+    ).all()
+    batch = ReconcileReport(
+        checked=checked,
+        next_after=upper,
+        mismatches=[
+            TotalMismatch(
+                uid=uid,
+                status=MyStatus(order_status).name,
+                total=total,
+                items_total=items_total,
+            )
+            for uid, order_status, _, _, total, items_total in rows
+        ],
+    )
+    if fix and rows:
+        batch.fixed = await fix_totals(db, orders_model, rows)
+    await db.commit()
+    return batch
+
+
+async def reconcile_orders(
+    fix: bool = False,
+    archived: bool = False,
+    batch_size: int = settings.RECONCILE_BATCH_SIZE,
+):
+    """Check every order batch by batch, yielding the report of each batch."""
+    after = None
+    async with AsyncSession(async_engine, expire_on_commit=False) as db:
+        while True:
+            batch = await reconcile_batch(db, after, batch_size, fix, archived)
+            yield batch
+            if batch.next_after is None:
+                return
+            after = batch.next_after
+
+
+async def main(fix: bool, archived: bool, batch_size: int):
+    checked = mismatched = fixed = 0
+    try:
+        async for batch in reconcile_orders(fix, archived, batch_size):
+            checked += batch.checked
+            mismatched += len(batch.mismatches)
+            fixed += batch.fixed
+            for mismatch in batch.mismatches:
+                print(
+                    f"{mismatch.uid} {mismatch.status:9} "
+                    f"total={mismatch.total:.2f} items={mismatch.items_total:.2f}"
+                )
+    finally:
+        await async_engine.dispose()
+    print(f"checked {checked} orders, {mismatched} mismatched, {fixed} fixed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fix", action="store_true", help="correct the totals")
+    parser.add_argument(
+        "--archived", action="store_true", help="check the archived orders instead"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.RECONCILE_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.fix, args.archived, args.batch_size))
@@ -0,0 +1,99 @@
+import hashlib
+import hmac
+import time
+from contextvars import ContextVar
+from itertools import cycle
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import POOL_OPTIONS, async_engine
+from database.pool import TimedAsyncQueuePool
+from utils.cache import TTLCache
+from utils.settings import get_async_database_url, settings
+
+# Cookie carrying a signed "<key>.<until>" write marker (see ReplicaRouter)
+WRITE_COOKIE = "last_write"
+
+# Write markers produced while serving the current request, set by
+# ReadYourWritesMiddleware so it can return them as WRITE_COOKIE
+request_write_markers: ContextVar[list | None] = ContextVar(
+    "request_write_markers", default=None
+)
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine for read-only sessions: replicas in round-robin order,
+    except for users who wrote recently, who stay on the primary for
+    `sticky_seconds` so they read their own writes despite replication lag.
+    A write is remembered in this process and, so that every worker honours
+    it, handed to the client as a signed marker to send back with its reads.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        sticky_seconds: float,
+        secret: str,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._secret = secret.encode()
+        self._next_replica = cycle(replicas)
+        self._recent_writers = TTLCache(maxsize=100_000, ttl=sticky_seconds)
+
+    def _sign(self, key, until: int) -> str:
+        message = f"{key}.{until}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()[:32]
+
+    def write_marker(self, key) -> str:
+        """Signed marker keeping `key`'s reads on the primary for the window."""
+        until = int((time.time() + self.sticky_seconds) * 1000)
+        return f"{key}.{until}.{self._sign(key, until)}"
+
+    def wrote_recently(self, key, marker: str | None) -> bool:
+        """Whether `marker` is a valid, unexpired write marker for `key`."""
+        try:
+            marker_key, until, signature = (marker or "").rsplit(".", 2)
+            until = int(until)
+        except ValueError:
+            return False
+        return (
+            marker_key == str(key)
+            and until > time.time() * 1000
+            and hmac.compare_digest(signature, self._sign(key, until))
+        )
+
+    def mark_write(self, key):
+        if self.replicas:
+            self._recent_writers.set(key, True)
+            markers = request_write_markers.get()
+            if markers is not None:
+                markers.append(self.write_marker(key))
+
+    def engine_for(self, key, marker: str | None = None) -> AsyncEngine:
+        if (
+            not self.replicas
+            or self._recent_writers.get(key)
+            or self.wrote_recently(key, marker)
+        ):
+            return self.primary
+        return next(self._next_replica)
+
+    def session_for(self, key, marker: str | None = None) -> AsyncSession:
+        return AsyncSession(self.engine_for(key, marker), expire_on_commit=False)
+
+
+replica_engines = [
+    create_async_engine(
+        get_async_database_url(url), poolclass=TimedAsyncQueuePool, **POOL_OPTIONS
+    )
+    for url in settings.READ_REPLICA_URLS
+]
+replica_router = ReplicaRouter(
+    async_engine,
+    replica_engines,
+    settings.READ_YOUR_WRITES_SECONDS,
+    settings.SECRET_KEY,
+)
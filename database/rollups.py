@@ -0,0 +1,185 @@
+"""
+Incrementally maintained sales rollups.
+
+Status changes adjust the rollup rows in the same transaction, so reports
+never scan the orders table. Order creation writes no rollup: every new order
+would otherwise lock the same PENDING row until it commits. Only finalized
+statuses are counted here; pending orders are counted from the orders table,
+through its status index. Items can only change on pending orders, so the
+revenue of a completed order never moves under the rollups.
+
+`backfill` rebuilds every rollup from scratch with set-based SQL; run it once
+after creating the tables, and whenever they need re-syncing (e.g. after
+orders were changed directly in SQL):
+
+    python -m database.rollups
+"""
+
+from collections import defaultdict
+from sqlalchemy import inspect, union_all
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlmodel import Session, delete, func, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import (
+    ArchivedItems,
+    ArchivedOrders,
+    DailySales,
+    ItemSales,
+    Items,
+    MyStatus,
+    Orders,
+    StatusCounts,
+    engine,
+)
+
+
+def increment(dialect: str, model, rows: list[dict], keys: list[str]):
+    """
+    Upsert `rows` into `model`, adding their non-key values to those of any
+    existing row with the same keys.
+    """
+    amounts = [name for name in rows[0] if name not in keys]
+    table = model.__table__
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(rows)
+        return statement.on_duplicate_key_update(
+            {name: table.c[name] + statement.inserted[name] for name in amounts}
+        )
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(table).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: table.c[name] + statement.excluded[name] for name in amounts},
+    )
+
+
+async def record_status_change(
+    db: AsyncSession, order: Orders, old_status: MyStatus, new_status: MyStatus
+):
+    """Move `order` between status counts, and in or out of the sales figures."""
+    old_status, new_status = MyStatus(old_status), MyStatus(new_status)
+    if old_status == new_status:
+        return
+    dialect = db.bind.dialect.name
+    counts = [
+        {"status": status.name, "orders": change}
+        for status, change in ((old_status, -1), (new_status, 1))
+        if status != MyStatus.PENDING
+    ]
+    await db.exec(increment(dialect, StatusCounts, counts, ["status"]))
+    if MyStatus.COMPLETED not in (old_status, new_status):
+        return
+
+    sign = 1 if new_status == MyStatus.COMPLETED else -1
+    await db.exec(
+        increment(
+            dialect,
+            DailySales,
+            [
+                {
+                    "day": order.created_at.date(),
+                    "orders": sign,
+                    "revenue": sign * order.total,
+                }
+            ],
+            ["day"],
+        )
+    )
+    if "items" in inspect(order).unloaded:
+        await db.refresh(order, ["items"])
+    sales = defaultdict(lambda: [0, 0.0])
+    for item in order.items:
+        sales[item.product_id, item.size_id][0] += item.quantity
+        sales[item.product_id, item.size_id][1] += item.quantity * item.unit_price
+    if sales:
+        await db.exec(
+            increment(
+                dialect,
+                ItemSales,
+                [
+                    {
+                        "product_id": product_id,
+                        "size_id": size_id,
+                        "quantity": sign * quantity,
+                        "revenue": sign * revenue,
+                    }
+                    for (product_id, size_id), (quantity, revenue) in sales.items()
+                ],
+                ["product_id", "size_id"],
+            )
+        )
+
+
+def backfill(session: Session):
+    """
+    Recompute every rollup from the orders and items tables, archived ones
+    included, in one transaction.
+    """
+    orders = union_all(
+        select(Orders.uid, Orders.status, Orders.total, Orders.created_at),
+        select(
+            ArchivedOrders.uid,
+            ArchivedOrders.status,
+            ArchivedOrders.total,
+            ArchivedOrders.created_at,
+        ),
+    ).subquery("all_orders")
+    items = union_all(
+        select(
+            Items.order_uid,
+            Items.product_id,
+            Items.size_id,
+            Items.quantity,
+            Items.unit_price,
+        ),
+        select(
+            ArchivedItems.order_uid,
+            ArchivedItems.product_id,
+            ArchivedItems.size_id,
+            ArchivedItems.quantity,
+            ArchivedItems.unit_price,
+        ),
+    ).subquery("all_items")
+    completed = orders.c.status == MyStatus.COMPLETED
+    day = func.date(orders.c.created_at)
+    for model in (DailySales, StatusCounts, ItemSales):
+        session.exec(delete(model))
+    session.exec(
+        insert(DailySales).from_select(
+            ["day", "orders", "revenue"],
+            select(day, func.count(), func.sum(orders.c.total))
+            .where(completed)
+            .group_by(day),
+        )
+    )
+    session.exec(
+        insert(StatusCounts).from_select(
+            ["status", "orders"],
+            select(orders.c.status, func.count())
+            .where(orders.c.status != MyStatus.PENDING)
+            .group_by(orders.c.status),
+        )
+    )
+    session.exec(
+        insert(ItemSales).from_select(
+            ["product_id", "size_id", "quantity", "revenue"],
+            select(
+                items.c.product_id,
+                items.c.size_id,
+                func.sum(items.c.quantity),
+                func.sum(items.c.quantity * items.c.unit_price),
+            )
+            .join(orders, items.c.order_uid == orders.c.uid)
+            .where(completed)
+            .group_by(items.c.product_id, items.c.size_id),
+        )
+    )
+    session.commit()
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        backfill(session)
+        for model in (DailySales, StatusCounts, ItemSales):
+            rows = session.exec(select(func.count()).select_from(model)).one()
+            print(f"{model.__tablename__}: {rows} rows")
@@ -1,18 +1,78 @@
+import importlib
+import time
+
+# Imported one at a time so the startup report can show what each costs; every
+# entry only counts the modules that no earlier entry had loaded yet
+STARTUP_IMPORTS = (
+    "fastapi",
+    "sqlmodel",
+    "schemas.schemas",
+    "utils",
+    "database",
+    "security.security",
+    "routes",
+)
+import_seconds = {}
+for module_name in STARTUP_IMPORTS:
+    import_started = time.perf_counter()
+    importlib.import_module(module_name)
+    import_seconds[module_name] = time.perf_counter() - import_started
+
 from fastapi import FastAPI
-from routes import auth, orders
+from routes import auth, catalog, internal, orders, reports
 from contextlib import asynccontextmanager
-from database.conn import create_db_and_tables
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.catalog import catalog as catalog_cache
+from database.conn import async_engine, engine
+from database.group_commit import order_ingest
+from database.pool import warm_up_pool
+from database.replicas import replica_engines
+from security.hashing import hashing_pool
+from security.security import warm_up_hashing, warm_up_jwt
+from utils.idempotency import IdempotencyMiddleware
+from utils.middleware import MetricsMiddleware, ReadYourWritesMiddleware
+from utils.ratelimit import RateLimitMiddleware
+from utils.settings import settings
+from utils.startup import startup_report
+
+for module_name, seconds in import_seconds.items():
+    startup_report.record(f"import {module_name}", seconds)
 
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     print("Starting up...")
-#     create_db_and_tables()
-#     yield
-#     print("Shutting down...")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Database warm-ups are best effort: the pools reconnect on demand, so an
+    # unreachable database should not keep the app from starting
+    with startup_report.step("database pool", required=False):
+        await warm_up_pool(async_engine, settings.DB_POOL_WARMUP)
+    for index, replica in enumerate(replica_engines):
+        with startup_report.step(f"replica{index} pool", required=False):
+            await warm_up_pool(replica, settings.DB_POOL_WARMUP)
+    with startup_report.step("catalog cache", required=False):
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            await catalog_cache.get(session)
+    with startup_report.step("password hashing"):
+        await warm_up_hashing()
+    with startup_report.step("jwt"):
+        warm_up_jwt()
+    startup_report.log()
+    yield
+    await order_ingest.close()
+    hashing_pool.shutdown()
+    for replica in replica_engines:
+        await replica.dispose()
+    await async_engine.dispose()
+    engine.dispose()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.auth_route)
 app.include_router(orders.orders_route)
+app.include_router(catalog.catalog_route)
+app.include_router(reports.reports_route)
+app.include_router(internal.internal_route)
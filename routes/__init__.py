@@ -1,3 +1,3 @@
-from . import auth, orders
+from . import auth, catalog, internal, orders, reports
 
-__all__ = ["auth", "orders"]
+__all__ = ["auth", "catalog", "internal", "orders", "reports"]
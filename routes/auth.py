@@ -1,47 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from schemas.schemas import UserCreate, Token
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from schemas.schemas import LogoutRequest, UserCreate, Token
 from security.security import (
-    get_password_hash,
+    REFRESH_TOKEN_EXPIRE,
+    get_password_hash_async,
     authenticate_user,
     create_access_token,
+    create_refresh_token,
+    revoke_token,
+    token_claims,
     oauth2_scheme,
+    use_refresh_token,
     verify_refresh_token,
+    get_current_admin,
     get_current_user,
 )
 from fastapi.security import OAuth2PasswordRequestForm
-from database.conn import Users, get_session
-from sqlmodel import Session, select
+from security.revocation import revoked_tokens
+from database.conn import Users, get_async_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Annotated
 from utils.settings import settings
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
 auth_route = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @auth_route.post("/signup")
-async def signup(user: UserCreate, db: Session = Depends(get_session)):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_session)):
     """
     Endpoint for user registration.
     """
     query = select(Users).where(Users.email == user.email)
-    existing_user = db.exec(query).first()
+    existing_user = (await db.exec(query)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     new_user = Users.model_validate(user)
     new_user.password = hashed_password
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return {"message": "User registered successfully!", "user_id": new_user.uid}
 
 
 @auth_route.post("/token", response_model=Token)
 async def signin(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ):
     """
     Endpoint for user authentication and token generation.
@@ -52,12 +60,9 @@ async def signin(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    refresh_token = create_access_token(
-        data={"sub": user.email}, expires_delta=timedelta(days=7)
-    )
+    claims = token_claims(user)
+    access_token = create_access_token(data=claims, expires_delta=access_token_expires)
+    refresh_token = create_refresh_token(claims)
     return Token(
         access_token=access_token,
         token_type="bearer",
@@ -69,7 +74,7 @@ async def signin(
 @auth_route.get("/refresh")
 async def refresh_token(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ):
     """
     Endpoint to refresh access token using a valid refresh token.
@@ -80,17 +85,56 @@ async def refresh_token(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
+    # Refresh tokens are single use: the one just presented is revoked, and
+    # only one of several concurrent refreshes with it succeeds
+    if not await use_refresh_token(db, token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+        )
+    await db.commit()
     user_email = verify_token.email
+    claims = token_claims(verify_token)
     new_access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     new_access_token = create_access_token(
-        data={"sub": user_email}, expires_delta=new_access_token_expires
-    )
-    new_refresh_token = create_access_token(
-        data={"sub": user_email}, expires_delta=timedelta(days=7)
+        data=claims, expires_delta=new_access_token_expires
     )
+    new_refresh_token = create_refresh_token(claims)
     return Token(
         access_token=new_access_token,
         token_type="bearer",
         data={"email": user_email},
         refresh_token={"access_token": new_refresh_token, "token_type": "bearer"},
     )
+
+
+@auth_route.post("/logout", dependencies=[Depends(get_current_user)])
+async def logout(
+    body: LogoutRequest | None = None,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Endpoint to revoke the access token used for this request and, when given,
+    the matching refresh token.
+    """
+    await revoke_token(db, token)
+    if body is not None and body.refresh_token:
+        await revoke_token(db, body.refresh_token)
+    await db.commit()
+    return {"message": "Logged out"}
+
+
+@auth_route.post("/revoke/{jti}", dependencies=[Depends(get_current_admin)])
+async def revoke(
+    jti: Annotated[str, Path(max_length=64)],
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Admin endpoint to revoke any token by its id (jti). The id is kept for the
+    longest token lifetime, since the token's own expiry is not known here.
+    """
+    expires_at = datetime.now(timezone.utc) + REFRESH_TOKEN_EXPIRE
+    await revoked_tokens.revoke(db, jti, expires_at)
+    await db.commit()
+    return {"message": "Token revoked", "jti": jti}
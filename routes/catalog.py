@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.catalog import bump_catalog_version, catalog
+from database.conn import Prices, Products, Sizes, get_async_session
+from schemas.schemas import PriceUpdate, ProductCreate, SizeCreate
+from security.security import get_current_admin
+
+catalog_route = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+@catalog_route.get("/")
+async def get_catalog(db: AsyncSession = Depends(get_async_session)):
+    """
+    Endpoint listing the products, sizes and prices that items can be ordered in.
+    """
+    current = await catalog.get(db)
+    return {
+        "version": current.version,
+        "products": list(current.products.values()),
+        "sizes": list(current.sizes.values()),
+        "prices": [
+            {"product_id": product_id, "size_id": size_id, "unit_price": unit_price}
+            for (product_id, size_id), unit_price in current.prices.items()
+        ],
+    }
+
+
+@catalog_route.post(
+    "/products", response_model=Products, dependencies=[Depends(get_current_admin)]
+)
+async def create_product(
+    product: ProductCreate, db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Endpoint to add a product to the catalog.
+    """
+    new_product = Products.model_validate(product)
+    db.add(new_product)
+    await bump_catalog_version(db)
+    await db.commit()
+    catalog.invalidate()
+    return new_product
+
+
+@catalog_route.post(
+    "/sizes", response_model=Sizes, dependencies=[Depends(get_current_admin)]
+)
+async def create_size(size: SizeCreate, db: AsyncSession = Depends(get_async_session)):
+    """
+    Endpoint to add a size to the catalog.
+    """
+    new_size = Sizes.model_validate(size)
+    db.add(new_size)
+    await bump_catalog_version(db)
+    await db.commit()
+    catalog.invalidate()
+    return new_size
+
+
+@catalog_route.put(
+    "/prices", response_model=Prices, dependencies=[Depends(get_current_admin)]
+)
+async def set_price(price: PriceUpdate, db: AsyncSession = Depends(get_async_session)):
+    """
+    Endpoint to set the price of a product in a size. Items already in orders
+    keep the price they were added at.
+    """
+    if (
+        await db.get(Products, price.product_id) is None
+        or await db.get(Sizes, price.size_id) is None
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product or size not found"
+        )
+    new_price = await db.merge(Prices.model_validate(price))
+    await bump_catalog_version(db)
+    await db.commit()
+    catalog.invalidate()
+    return new_price
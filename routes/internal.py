@@ -0,0 +1,142 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from database.conn import async_engine, engine
+from database.group_commit import order_ingest
+from database.pool import pool_stats
+from database.replicas import replica_engines
+from security.hashing import hashing_pool
+from security.revocation import revoked_tokens
+from security.security import get_current_admin, user_cache
+from security.token_versions import token_versions
+from utils.pubsub import order_events
+from utils.metrics import CallbackCounter, Gauge, registry
+from utils.startup import startup_report
+
+internal_route = APIRouter(prefix="/internal", tags=["internal"])
+
+
+def pooled_engines() -> dict:
+    """Sync views of every engine with a pool, by label."""
+    engines = {"async": async_engine.sync_engine, "sync": engine}
+    for index, replica in enumerate(replica_engines):
+        engines[f"replica{index}"] = replica.sync_engine
+    return engines
+
+
+# Values kept by other components, read only when /internal/metrics is scraped
+registry.register(
+    Gauge(
+        "db_pool_checked_out",
+        "Connections currently checked out of the pool.",
+        lambda: {
+            (label,): pooled.pool.checkedout()
+            for label, pooled in pooled_engines().items()
+        },
+        ("engine",),
+    )
+)
+registry.register(
+    CallbackCounter(
+        "db_pool_wait_seconds_total",
+        "Total time spent waiting for a pooled connection.",
+        lambda: {
+            (label,): pooled.pool.wait.total
+            for label, pooled in pooled_engines().items()
+        },
+        ("engine",),
+    )
+)
+registry.register(
+    Gauge(
+        "hashing_pool_queue_depth",
+        "Password hashing jobs waiting for a worker.",
+        lambda: {(): hashing_pool.stats()["queue_depth"]},
+    )
+)
+registry.register(
+    CallbackCounter(
+        "hashing_pool_rejected_total",
+        "Password hashing jobs rejected because the queue was full.",
+        lambda: {(): hashing_pool.rejected},
+    )
+)
+registry.register(
+    Gauge(
+        "order_stream_subscribers",
+        "Open GET /orders/stream connections in this worker.",
+        lambda: {(): order_events.stats()["subscribers"]},
+    )
+)
+registry.register(
+    CallbackCounter(
+        "user_cache_requests_total",
+        "Authenticated-user cache lookups by result.",
+        lambda: {("hit",): user_cache.hits, ("miss",): user_cache.misses},
+        ("result",),
+    )
+)
+
+
+@internal_route.get("/hashing", dependencies=[Depends(get_current_admin)])
+async def hashing_stats():
+    """
+    Endpoint exposing password hashing pool queue depth and latency.
+    """
+    return hashing_pool.stats()
+
+
+@internal_route.get("/user-cache", dependencies=[Depends(get_current_admin)])
+async def user_cache_stats():
+    """
+    Endpoint exposing authenticated-user cache size and hit/miss counters.
+    """
+    return user_cache.stats()
+
+
+@internal_route.get("/token-versions", dependencies=[Depends(get_current_admin)])
+async def token_version_stats():
+    """
+    Endpoint exposing token version cache size and hit/miss counters.
+    """
+    return token_versions.stats()
+
+
+@internal_route.get("/revocations", dependencies=[Depends(get_current_admin)])
+async def revocation_stats():
+    """
+    Endpoint exposing how many revoked token ids are held in memory.
+    """
+    return revoked_tokens.stats()
+
+
+@internal_route.get("/order-ingest", dependencies=[Depends(get_current_admin)])
+async def order_ingest_stats():
+    """
+    Endpoint exposing group commit queue depth and batch sizes.
+    """
+    return order_ingest.stats()
+
+
+@internal_route.get("/pool", dependencies=[Depends(get_current_admin)])
+async def connection_pool_stats():
+    """
+    Endpoint exposing connection pool occupancy and checkout wait time.
+    """
+    return {label: pool_stats(pooled) for label, pooled in pooled_engines().items()}
+
+
+@internal_route.get("/startup", dependencies=[Depends(get_current_admin)])
+async def startup_stats():
+    """
+    Endpoint exposing the time spent on each import and warm-up step at startup.
+    """
+    return startup_report.as_dict()
+
+
+@internal_route.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Endpoint exposing request, SQL and pool metrics in Prometheus text format.
+    The only internal endpoint open without a token, so scrapers can read it.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,25 +1,212 @@
-from fastapi import APIRouter
-from schemas.schemas import OrderCreate, OrderRead, ItemCreate
-from sqlmodel import Session, select
-from database.conn import get_session, Orders, Users, Items
+from fastapi import APIRouter, Body, Cookie, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from schemas.schemas import OrderCreate, OrderRead, OrderPage, ItemCreate, Principal
+from sqlmodel import and_, delete, func, insert, or_, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
+from database.conn import get_async_session, ArchivedOrders, Orders, Items, MyStatus
 from fastapi import Depends, HTTPException, status
-from security.security import get_current_user
+from database.catalog import catalog
+from database.group_commit import order_ingest
+from database.replicas import WRITE_COOKIE, replica_router
+from database.rollups import record_status_change
+from security.security import (
+    get_current_active_user,
+    get_current_user,
+    get_read_session,
+)
+from utils.etag import etag_matches, make_etag
+from utils.export import csv_chunks, ndjson_chunks
+from utils.pagination import decode_cursor, encode_cursor
+from utils.serialization import (
+    ITEM_FIELDS,
+    ORDER_FIELDS,
+    ORJSONResponse,
+    order_to_dict,
+)
+from utils.settings import settings
+from utils.pubsub import order_events
 from uuid import UUID
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Literal
+import asyncio
+import json
 
 orders_route = APIRouter(
-    prefix="/orders", tags=["orders"], dependencies=[Depends(get_current_user)]
+    prefix="/orders",
+    tags=["orders"],
+    dependencies=[Depends(get_current_active_user)],
 )
 
 
+def paginate_orders(query, cursor: str | None, limit: int, model=Orders):
+    """
+    Apply keyset pagination on (created_at, uid), newest first. Fetches one
+    extra row so order_page can tell whether another page exists.
+    """
+    if cursor is not None:
+        try:
+            created_at, uid = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        query = query.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.uid < uid),
+            )
+        )
+    return query.order_by(model.created_at.desc(), model.uid.desc()).limit(limit + 1)
+
+
+def order_page_queries(
+    cursor: str | None,
+    limit: int,
+    include_archived: bool,
+    user_uid: UUID | None = None,
+) -> list:
+    """paginate_orders queries on the orders table and, if asked, the archive."""
+    queries = []
+    for model in (Orders, ArchivedOrders) if include_archived else (Orders,):
+        query = select(model).options(selectinload(model.items))
+        if user_uid is not None:
+            query = query.where(model.user_uid == user_uid)
+        queries.append(paginate_orders(query, cursor, limit, model))
+    return queries
+
+
+async def fetch_order_page(db: AsyncSession, queries: list, limit: int) -> list:
+    """Run order_page_queries and merge their rows, newest first."""
+    orders = []
+    for query in queries:
+        orders.extend((await db.exec(query)).all())
+    if len(queries) > 1:
+        orders.sort(key=lambda order: (order.created_at, order.uid), reverse=True)
+    return orders[: limit + 1]
+
+
+def order_page(orders: list[Orders], limit: int) -> ORJSONResponse:
+    """
+    Build an OrderPage response from rows fetched by paginate_orders,
+    serialized directly from the ORM rows.
+    """
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].uid)
+    return ORJSONResponse(
+        {
+            "orders": [order_to_dict(order) for order in orders],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def publish_order_event(user_uid: UUID, order_uid: UUID, event: str, **data):
+    """Notify the owner's /orders/stream subscribers that an order changed."""
+    order_events.publish(
+        user_uid, {"event": event, "order_uid": str(order_uid), **data}
+    )
+
+
+async def increment_order_total(
+    db: AsyncSession,
+    order_id: UUID,
+    current_user: Principal,
+    amount: float,
+    forbidden_detail: str,
+):
+    """
+    Add `amount` to the order total with a single server-side UPDATE, so
+    concurrent item changes cannot overwrite each other. Only pending orders
+    can change: completed ones are already in the sales rollups. The status
+    and permission checks are part of the UPDATE; the order is only read when
+    no row matched, to report why.
+    """
+    if current_user.admin:
+        result = await db.exec(
+            update(Orders)
+            .where(
+                Orders.uid == order_id,
+                Orders.status == MyStatus.PENDING,
+                Orders.user_uid == current_user.uid,
+            )
+            .values(total=Orders.total + amount, version=Orders.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return
+    order = (await db.exec(select(Orders).where(Orders.uid == order_id))).first()
+    if not order or order.status == "CANCELLED":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found or is cancelled",
+        )
+    if not current_user.admin or order.user_uid != current_user.uid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=forbidden_detail
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Items of a completed order cannot be changed",
+    )
+
+
+async def catalog_prices(db: AsyncSession, items: list[ItemCreate]) -> list[float]:
+    """Unit price of each item, read from the in-process catalog cache."""
+    prices = await catalog.get(db)
+    unit_prices = [prices.price(item.product_id, item.size_id) for item in items]
+    if None in unit_prices:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product or size not found in the catalog",
+        )
+    return unit_prices
+
+
+async def change_order_status(db: AsyncSession, order: Orders, new_status: MyStatus):
+    """
+    Move `order` to `new_status` and update the sales rollups in the same
+    transaction. The UPDATE only matches while the order still has the version
+    it was read with, so a racing transition is not counted twice and the
+    rollups never take a total or items that changed since the read.
+    """
+    result = await db.exec(
+        update(Orders)
+        .where(Orders.uid == order.uid, Orders.version == order.version)
+        .values(status=new_status, version=Orders.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The order was changed concurrently, please retry",
+        )
+    await record_status_change(db, order, order.status, new_status)
+
+
 @orders_route.post("/", response_model=OrderRead)
-async def create_order(order: OrderCreate, db: Session = Depends(get_session)):
+async def create_order(
+    order: OrderCreate, db: AsyncSession = Depends(get_async_session)
+):
     """
     Endpoint to create a new order in the database."""
     try:
         new_order = Orders.model_validate(order)
+        if settings.ORDER_INGEST_ENABLED:
+            # A new order has no items, so there is nothing to refresh
+            new_order.items = []
+            # Return the connection used to authenticate before waiting: the
+            # writer needs one from the same pool to commit the batch
+            await db.close()
+            await order_ingest.submit(new_order)
+            replica_router.mark_write(new_order.user_uid)
+            return new_order
         db.add(new_order)
-        db.commit()
-        db.refresh(new_order)
+        await db.commit()
+        replica_router.mark_write(new_order.user_uid)
+        await db.refresh(new_order, ["items"])
         return new_order
     except Exception as e:
         raise HTTPException(
@@ -31,8 +218,8 @@ async def create_order(order: OrderCreate, db: Session = Depends(get_session)):
 @orders_route.get("/cancel/{order_id}")
 async def cancel_order(
     order_id: UUID,
-    db: Session = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Endpoint to cancel an existing order by its ID.
@@ -40,44 +227,52 @@ async def cancel_order(
     try:
 
         query = select(Orders).where(Orders.uid == order_id)
-        order = db.exec(query).first()
+        order = (await db.exec(query)).first()
+        if not order:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+            )
         if not current_user.admin or order.user_uid != current_user.uid:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to cancel this order",
             )
-        if not order:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
-            )
-        order.status = "CANCELLED"
-
-        db.commit()
-        db.refresh(order)
+        await change_order_status(db, order, MyStatus.CANCELLED)
+        await db.commit()
+        replica_router.mark_write(order.user_uid)
+        await db.refresh(order)
+        publish_order_event(
+            order.user_uid, order.uid, "status_changed", status=order.status
+        )
         return {"message": f"Order {order_id} cancelled successfully!", "order": order}
+    except HTTPException:
+        raise
     except Exception as e:
         return {"message": f"An error occurred while canceling the order: {str(e)}"}
 
 
-@orders_route.get("/", response_model=list[OrderRead])
+@orders_route.get("/", response_model=OrderPage)
 async def list_orders(
-    db: Session = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
-    offset: int = 0,
-    limit: int = 20,
+    db: AsyncSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    include_archived: bool = False,
 ):
     """
-    Endpoint to list all orders in the database.
+    Endpoint to list all orders in the database, newest first.
+    Pass the returned next_cursor to fetch the following page, and
+    include_archived=true to also list archived orders.
     """
     if current_user.admin == False:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to view all orders",
         )
+    queries = order_page_queries(cursor, limit, include_archived)
     try:
-        query = select(Orders).offset(offset).limit(limit)
-        orders = db.exec(query).all()
-        return orders
+        orders = await fetch_order_page(db, queries, limit)
+        return order_page(orders, limit)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,45 +280,95 @@ async def list_orders(
         )
 
 
+@orders_route.get("/export")
+async def export_orders(
+    current_user: Principal = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    order_status: MyStatus | None = Query(default=None, alias="status"),
+    start: date | None = None,
+    end: date | None = None,
+    last_write: str | None = Cookie(default=None, alias=WRITE_COOKIE),
+):
+    """
+    Endpoint streaming orders and their items, oldest first, as NDJSON (one
+    order per line) or CSV (one item per line). Rows are read through a
+    server-side cursor in chunks, so memory use does not grow with the table.
+    Filter by status and by creation date, from start to end inclusive.
+    """
+    if current_user.admin == False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to export orders",
+        )
+    query = (
+        select(
+            *[getattr(Orders, name) for name in ORDER_FIELDS],
+            *[getattr(Items, name).label(f"item_{name}") for name in ITEM_FIELDS],
+        )
+        .outerjoin(Items, Items.order_uid == Orders.uid)
+        .order_by(Orders.created_at, Orders.uid)
+        .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    )
+    if order_status is not None:
+        query = query.where(Orders.status == order_status)
+    if start is not None:
+        query = query.where(
+            Orders.created_at >= datetime.combine(start, time.min, timezone.utc)
+        )
+    if end is not None:
+        query = query.where(
+            Orders.created_at
+            < datetime.combine(end + timedelta(days=1), time.min, timezone.utc)
+        )
+
+    async def partitions():
+        # The session lives as long as the response body, not the request scope
+        async with replica_router.session_for(current_user.uid, last_write) as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield rows
+
+    if format == "csv":
+        body, media_type = csv_chunks(partitions()), "text/csv"
+    else:
+        body, media_type = ndjson_chunks(partitions()), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
+
+
 @orders_route.post("/add-item/{order_id}")
 async def add_item_to_order(
     order_id: UUID,
     item: ItemCreate,
-    db: Session = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
-    Endpoint to add an item to an existing order.
+    Endpoint to add an item to an existing order, priced from the catalog.
     """
+    [unit_price] = await catalog_prices(db, [item])
     try:
-        query = select(Orders).where(
-            Orders.uid == order_id
-        )  # Check if the order exists and if the user has permission to add items to it
-        order = db.exec(query).first()
-        if not order or order.status == "CANCELLED":  # Check if the order exists
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found or is cancelled",
-            )
-        if (
-            not current_user.admin or current_user.uid != order.user_uid
-        ):  # Check if the user has permission to add items to the order
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to add items to this order",
-            )
-
+        await increment_order_total(
+            db,
+            order_id,
+            current_user,
+            unit_price * item.quantity,
+            "You do not have permission to add items to this order",
+        )  # Check the order and update its total in the same statement
         item.order_uid = order_id  # Set the order_uid of the item to the order_id
         new_item = Items.model_validate(
-            item
+            item, update={"unit_price": unit_price}
         )  # Create a new item instance from the ItemCreate schema
         db.add(new_item)  # Add the new item to the database session
-        order.total += (
-            item.unit_price * item.quantity
-        )  # Update the total price of the order by adding the price of the new item
-        db.commit()  # Commit the transaction to save the changes to the database
-        db.refresh(order)  # Refresh the order instance to get the updated total price
+        await db.commit()  # Commit the transaction to save the changes to the database
+        replica_router.mark_write(current_user.uid)
+        publish_order_event(current_user.uid, order_id, "items_changed")
         return {"message": f"Item added to order {order_id} successfully!"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -131,41 +376,93 @@ async def add_item_to_order(
         )
 
 
+@orders_route.post("/add-items/{order_id}")
+async def add_items_to_order(
+    order_id: UUID,
+    items: list[ItemCreate] = Body(
+        min_length=1, max_length=settings.ITEM_BATCH_MAX_SIZE
+    ),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Endpoint to add several items to an existing order in a single transaction,
+    priced from the catalog.
+    """
+    unit_prices = await catalog_prices(db, items)
+    try:
+        await increment_order_total(
+            db,
+            order_id,
+            current_user,
+            sum(
+                unit_price * item.quantity
+                for item, unit_price in zip(items, unit_prices)
+            ),
+            "You do not have permission to add items to this order",
+        )
+        rows = [
+            Items.model_validate(
+                item, update={"order_uid": order_id, "unit_price": unit_price}
+            ).model_dump()
+            for item, unit_price in zip(items, unit_prices)
+        ]
+        await db.exec(insert(Items).values(rows))  # One multi-row INSERT
+        await db.commit()
+        replica_router.mark_write(current_user.uid)
+        publish_order_event(current_user.uid, order_id, "items_changed")
+        return {"message": f"{len(rows)} items added to order {order_id} successfully!"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while adding items to the order: {str(e)}",
+        )
+
+
 @orders_route.delete("/remove-item/{item_id}")
 async def remove_item_from_order(
     item_uid: UUID,
-    db: Session = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Endpoint to remove an item from an existing order.
     """
     try:
         query = select(Items).where(Items.uid == item_uid)
-        item = db.exec(query).first()
+        item = (await db.exec(query)).first()
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
             )
-        order_query = select(Orders).where(Orders.uid == item.order_uid)
-        order = db.exec(order_query).first()
-        if not order or order.status == "CANCELLED":
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found or is cancelled",
-            )
-        if not current_user.admin or current_user.uid != order.user_uid:
+        # Delete first: a concurrent removal of the same item matches no row
+        # here instead of subtracting its price twice
+        deleted = await db.exec(
+            delete(Items)
+            .where(Items.uid == item_uid)
+            .execution_options(synchronize_session=False)
+        )
+        if deleted.rowcount != 1:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to remove items from this order",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
             )
-        order.total -= item.unit_price * item.quantity
-        db.delete(item)
-        db.commit()
-        db.refresh(order)
+        await increment_order_total(
+            db,
+            item.order_uid,
+            current_user,
+            -item.unit_price * item.quantity,
+            "You do not have permission to remove items from this order",
+        )
+        await db.commit()
+        replica_router.mark_write(current_user.uid)
+        publish_order_event(current_user.uid, item.order_uid, "items_changed")
         return {
-            "message": f"Item {item_uid} removed from order {order.uid} successfully!"
+            "message": f"Item {item_uid} removed from order {item.order_uid} successfully!"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -173,18 +470,22 @@ async def remove_item_from_order(
         )
 
 
-@orders_route.post("/complete/{order_id}", response_model=OrderRead)
+@orders_route.post("/complete/{order_uid}", response_model=OrderRead)
 async def complete_order(
     order_uid: UUID,
-    db: Session = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Endpoint to mark an order as completed.
     """
     try:
-        query = select(Orders).where(Orders.uid == order_uid)
-        order = db.exec(query).first()
+        query = (
+            select(Orders)
+            .where(Orders.uid == order_uid)
+            .options(selectinload(Orders.items))
+        )
+        order = (await db.exec(query)).first()
         if not order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -199,10 +500,16 @@ async def complete_order(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot complete a cancelled order",
             )
-        order.status = "COMPLETED"
-        db.commit()
-        db.refresh(order)
+        await change_order_status(db, order, MyStatus.COMPLETED)
+        await db.commit()
+        replica_router.mark_write(order.user_uid)
+        await db.refresh(order)
+        publish_order_event(
+            order.user_uid, order.uid, "status_changed", status=order.status
+        )
         return order
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -210,25 +517,85 @@ async def complete_order(
         )
 
 
-@orders_route.get("/user-orders", response_model=list[OrderRead])
+@orders_route.get("/user-orders", response_model=OrderPage)
 async def get_orders_by_user(
-    db: Session = Depends(get_session), current_user: Users = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    include_archived: bool = False,
+    if_none_match: str | None = Header(default=None),
 ):
     """
-    Endpoint to get all orders for a specific user.
+    Endpoint to get the orders of the current user, newest first.
+    Pass the returned next_cursor to fetch the following page, and
+    include_archived=true to also list archived orders.
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    without the orders being loaded again.
     """
+    # Any order created or changed moves the count or the version sum
+    marker_query = select(
+        func.count(), func.coalesce(func.sum(Orders.version), 0)
+    ).where(Orders.user_uid == current_user.uid)
+    count, version_sum = (await db.exec(marker_query)).one()
+    # Archiving an order lowers the count, so pages with archived orders change too
+    etag = make_etag(
+        current_user.uid, count, version_sum, cursor, limit, include_archived
+    )
+    if count and etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    queries = order_page_queries(cursor, limit, include_archived, current_user.uid)
     try:
-        query = select(Orders).where(Orders.user_uid == current_user.uid)
-        orders = db.exec(query).all()
-        if not orders:
+        orders = await fetch_order_page(db, queries, limit)
+        if not orders and cursor is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No orders found for this user",
             )
-        return orders
+        response = order_page(orders, limit)
+        response.headers["ETag"] = etag
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while fetching orders for the user: {str(e
-        )}",
+            detail=f"An error occurred while fetching orders for the user: {str(e)}",
         )
+
+
+@orders_route.get("/stream")
+async def stream_order_events(
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Endpoint streaming the current user's order changes as Server-Sent Events,
+    so clients do not have to poll /orders/user-orders. Each event names the
+    order and what changed; a comment is sent periodically to keep the
+    connection open.
+    """
+    # Return the connection used to authenticate; it is not needed while streaming
+    await db.close()
+
+    async def events():
+        with order_events.subscribe(current_user.uid) as queue:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.ORDER_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,123 @@
+from datetime import date
+from typing import Literal
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import desc, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import (
+    DailySales,
+    ItemSales,
+    MyStatus,
+    Orders,
+    Products,
+    Sizes,
+    StatusCounts,
+    get_async_session,
+)
+from database.reconcile import reconcile_batch
+from schemas.schemas import ReconcileReport, TopItem
+from security.security import get_current_admin, get_read_session
+from utils.settings import settings
+
+reports_route = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@reports_route.get(
+    "/revenue",
+    response_model=list[DailySales],
+    dependencies=[Depends(get_current_admin)],
+)
+async def revenue_per_day(
+    db: AsyncSession = Depends(get_read_session),
+    start: date | None = None,
+    end: date | None = None,
+):
+    """
+    Endpoint listing completed orders and revenue per day, oldest first.
+    """
+    query = select(DailySales).order_by(DailySales.day)
+    if start is not None:
+        query = query.where(DailySales.day >= start)
+    if end is not None:
+        query = query.where(DailySales.day <= end)
+    return (await db.exec(query)).all()
+
+
+@reports_route.get(
+    "/status-counts",
+    response_model=dict[MyStatus, int],
+    dependencies=[Depends(get_current_admin)],
+)
+async def order_status_counts(db: AsyncSession = Depends(get_read_session)):
+    """
+    Endpoint counting orders in each status.
+    """
+    counts = dict.fromkeys(MyStatus, 0)
+    for row in (await db.exec(select(StatusCounts))).all():
+        counts[row.status] = row.orders
+    # Pending orders are never archived, so the index on orders covers them all
+    pending = select(func.count()).where(Orders.status == MyStatus.PENDING)
+    counts[MyStatus.PENDING] = (await db.exec(pending)).one()
+    return counts
+
+
+@reports_route.get(
+    "/top-items",
+    response_model=list[TopItem],
+    dependencies=[Depends(get_current_admin)],
+)
+async def top_items(
+    db: AsyncSession = Depends(get_read_session),
+    by: Literal["flavor", "size"] = "flavor",
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """
+    Endpoint ranking item flavors or sizes by quantity sold in completed orders.
+    """
+    if by == "flavor":
+        column, catalog_table, key = Products.flavor, Products, ItemSales.product_id
+    else:
+        column, catalog_table, key = Sizes.name, Sizes, ItemSales.size_id
+    quantity = func.sum(ItemSales.quantity)
+    query = (
+        select(column, quantity, func.sum(ItemSales.revenue))
+        .join(catalog_table, key == catalog_table.id)
+        .group_by(column)
+        .having(quantity > 0)
+        .order_by(desc(quantity))
+        .limit(limit)
+    )
+    return [
+        TopItem(value=value, quantity=quantity, revenue=revenue)
+        for value, quantity, revenue in (await db.exec(query)).all()
+    ]
+
+
+@reports_route.post(
+    "/reconcile",
+    response_model=ReconcileReport,
+    dependencies=[Depends(get_current_admin)],
+)
+async def reconcile_order_totals(
+    db: AsyncSession = Depends(get_async_session),
+    after: UUID | None = None,
+    limit: int = Query(default=10000, ge=1, le=100000),
+    fix: bool = False,
+    archived: bool = False,
+):
+    """
+    Endpoint checking up to `limit` orders, in uid order after `after`, against
+    the sum of their items, and correcting the mismatches when fix=true.
+    Pass next_after back as `after` to continue with the following orders.
+    """
+    report = ReconcileReport(next_after=after)
+    while report.checked < limit:
+        batch_size = min(settings.RECONCILE_BATCH_SIZE, limit - report.checked)
+        batch = await reconcile_batch(db, report.next_after, batch_size, fix, archived)
+        report.checked += batch.checked
+        report.fixed += batch.fixed
+        report.mismatches.extend(batch.mismatches)
+        report.next_after = batch.next_after
+        if batch.next_after is None:
+            break
+    return report
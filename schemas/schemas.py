@@ -1,5 +1,6 @@
 from sqlmodel import SQLModel, Field
 from uuid import UUID
+from datetime import datetime
 from pydantic import EmailStr
 from pydantic import BaseModel
 
@@ -29,32 +30,46 @@ class UserUpdate(SQLModel):
 
 # Schemas for Item
 
+# Largest quantity accepted for a single item; quantities must be positive
+ITEM_MAX_QUANTITY = 100
+
 
 class ItemCreate(SQLModel):
-    name: str
-    quantity: int = Field(default=0)
-    flavor: str = Field(default="")
-    size: str = Field(default="")
-    unit_price: float = Field(default=0.0)
+    product_id: int
+    size_id: int
+    quantity: int = Field(default=1, gt=0, le=ITEM_MAX_QUANTITY)
     order_uid: UUID | None = None
 
 
 class ItemRead(SQLModel):
     uid: UUID
-    name: str
+    product_id: int
+    size_id: int
     quantity: int
-    flavor: str
-    size: str
     unit_price: float
     order_uid: UUID
 
 
 class ItemUpdate(SQLModel):
-    name: str = None
-    quantity: int = None
-    flavor: str = None
-    size: str = None
-    unit_price: float = None
+    product_id: int = None
+    size_id: int = None
+    quantity: int = Field(default=None, gt=0, le=ITEM_MAX_QUANTITY)
+
+
+# Schemas for the catalog
+class ProductCreate(SQLModel):
+    name: str
+    flavor: str = Field(default="")
+
+
+class SizeCreate(SQLModel):
+    name: str
+
+
+class PriceUpdate(SQLModel):
+    product_id: int
+    size_id: int
+    unit_price: float = Field(ge=0)
 
 
 # Schemas for Order
@@ -67,15 +82,44 @@ class OrderRead(SQLModel):
     status: str
     user_uid: UUID
     total: float
+    created_at: datetime
     items: list[ItemRead] = []
 
 
+class OrderPage(SQLModel):
+    orders: list[OrderRead]
+    next_cursor: str | None = None
+
+
 class OrderUpdate(SQLModel):
     status: str = None
     user_uid: UUID = None
     total: float = None
 
 
+# Schemas for sales reports
+class TopItem(SQLModel):
+    value: str
+    quantity: int
+    revenue: float
+
+
+# Order totals checked against the sum of their items (see database.reconcile)
+class TotalMismatch(SQLModel):
+    uid: UUID
+    status: str
+    total: float
+    items_total: float
+
+
+class ReconcileReport(SQLModel):
+    checked: int = 0
+    fixed: int = 0
+    mismatches: list[TotalMismatch] = []
+    # Pass back as `after` to continue; None once every order has been checked
+    next_after: UUID | None = None
+
+
 # Token
 class Token(SQLModel):
     access_token: str
@@ -84,5 +128,18 @@ class Token(SQLModel):
     refresh_token: dict | None = None
 
 
+class LogoutRequest(SQLModel):
+    # Revoked along with the access token the request is authorized with
+    refresh_token: str | None = None
+
+
 class TokenData(SQLModel):
     email: EmailStr | None = None
+
+
+# Authenticated user as seen by the routes, built from the Users row or from token claims
+class Principal(SQLModel):
+    uid: UUID
+    email: EmailStr
+    active: bool
+    admin: bool
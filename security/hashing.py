@@ -0,0 +1,81 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from utils.metrics import LatencyStats
+from utils.settings import settings
+
+
+class HashingPool:
+    """
+    Runs password hashing and verification on a worker pool so argon2 does not
+    block the event loop. Work beyond `workers + queue_size` is rejected with a
+    503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, kind: str, workers: int, queue_size: int):
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.rejected = 0
+        self.latency = {"hash": LatencyStats(), "verify": LatencyStats()}
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    async def run(self, operation: str, func, *args):
+        """Run `func(*args)` on the pool, recording latency under `operation`."""
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.latency[operation].observe(time.perf_counter() - start)
+
+    async def warm_up(self, operation: str, func, *args):
+        """Run `func(*args)` once per worker at the same time, starting them all."""
+        await asyncio.gather(
+            *(self.run(operation, func, *args) for _ in range(self.workers))
+        )
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "rejected": self.rejected,
+            "latency": {name: s.as_dict() for name, s in self.latency.items()},
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    kind=settings.HASH_POOL_KIND,
+    workers=settings.HASH_POOL_WORKERS,
+    queue_size=settings.HASH_POOL_QUEUE_SIZE,
+)
@@ -0,0 +1,112 @@
+import heapq
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import delete, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import RevokedTokens, utc_now
+from utils.settings import settings
+
+# Revocations committed this long before a sync are read again, so a row
+# whose transaction committed after the previous sync ran is not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationList:
+    """
+    Ids (jti) of revoked tokens that have not expired yet, so checking a token
+    is a dict lookup. Revocations are stored in RevokedTokens, and the ones
+    made by other workers are loaded at most every `sync_interval` seconds.
+    Entries are dropped once the token they revoke would have expired anyway.
+    """
+
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        self._expiries: dict[str, float] = {}
+        # (expiry, jti) min-heap, so eviction only looks at expired entries
+        self._by_expiry: list[tuple[float, str]] = []
+        self._synced_at: datetime | None = None
+        self._checked_at = 0.0
+
+    def add(self, jti: str, expires_at: datetime):
+        expiry = expires_at.timestamp()
+        if expiry <= time.time() or jti in self._expiries:
+            return
+        self._expiries[jti] = expiry
+        heapq.heappush(self._by_expiry, (expiry, jti))
+
+    def evict(self):
+        now = time.time()
+        while self._by_expiry and self._by_expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._by_expiry)
+            del self._expiries[jti]
+
+    async def sync(self, db: AsyncSession):
+        """
+        Load revocations made elsewhere if the last load is out of date. Only
+        one request reloads at a time; the others keep using the current list
+        instead of each holding a connection for the same query.
+        """
+        if time.monotonic() - self._checked_at >= self.sync_interval:
+            self._checked_at = time.monotonic()
+            try:
+                await self.refresh(db)
+            except Exception:
+                self._checked_at = 0.0
+                raise
+
+    async def refresh(self, db: AsyncSession):
+        started = utc_now()
+        query = select(RevokedTokens.jti, RevokedTokens.expires_at).where(
+            RevokedTokens.expires_at > started
+        )
+        if self._synced_at is not None:
+            query = query.where(
+                RevokedTokens.revoked_at >= self._synced_at - SYNC_OVERLAP
+            )
+        for jti, expires_at in (await db.exec(query)).all():
+            self.add(jti, expires_at)
+        self.evict()
+        self._synced_at = started
+        self._checked_at = time.monotonic()
+
+    async def is_revoked(self, db: AsyncSession, jti: str | None) -> bool:
+        await self.sync(db)
+        return jti is not None and jti in self._expiries
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: datetime):
+        """
+        Revoke `jti` until `expires_at`, in the caller's transaction. Rows of
+        tokens that have expired since are deleted on the way.
+        """
+        await db.exec(
+            delete(RevokedTokens).where(RevokedTokens.expires_at <= utc_now())
+        )
+        await db.merge(RevokedTokens(jti=jti, expires_at=expires_at))
+        self.add(jti, expires_at)
+
+    async def use(self, db: AsyncSession, jti: str, expires_at: datetime) -> bool:
+        """
+        Revoke a single-use token, in the caller's transaction. The row is
+        inserted rather than merged, so when two requests use the same token
+        the second hits the primary key and gets False. The caller's
+        transaction is rolled back in that case.
+        """
+        row = RevokedTokens(jti=jti, expires_at=expires_at)
+        try:
+            await db.exec(insert(RevokedTokens).values(row.model_dump()))
+        except IntegrityError:
+            await db.rollback()
+            self.add(jti, expires_at)
+            return False
+        self.add(jti, expires_at)
+        return True
+
+    def stats(self) -> dict:
+        return {"size": len(self._expiries), "synced_at": self._synced_at}
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+
+revoked_tokens = RevocationList(sync_interval=settings.REVOCATION_SYNC_INTERVAL)
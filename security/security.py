@@ -5,17 +5,50 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pwdlib import PasswordHash
 from typing import Annotated
-from sqlmodel import Session, select
-from fastapi import Depends, HTTPException, status
-from database.conn import Users, get_session
-from schemas.schemas import Token, TokenData
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import Cookie, Depends, HTTPException, status
+from sqlalchemy import event, inspect
+from database.conn import Users, get_async_session
+from database.replicas import WRITE_COOKIE, replica_router
+from schemas.schemas import Principal, Token, TokenData
+from security.hashing import hashing_pool
+from security.revocation import revoked_tokens
+from security.token_versions import token_versions
+from utils.cache import TTLCache
+from uuid import uuid4
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE = timedelta(days=7)
 
 password_hasher = PasswordHash.recommended()
 
+# Resolved users keyed by token subject, so most requests skip the Users lookup.
+# Entries are dropped when a user row changes in this process; other workers
+# catch up once USER_CACHE_TTL expires.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+@event.listens_for(Users, "before_update")
+def bump_token_version(mapper, connection, target):
+    """Invalidate issued tokens when the permissions they carry change."""
+    attrs = inspect(target).attrs
+    if attrs.admin.history.has_changes() or attrs.active.history.has_changes():
+        target.token_version += 1
+
+
+@event.listens_for(Users, "after_update")
+@event.listens_for(Users, "after_delete")
+def invalidate_cached_user(mapper, connection, target):
+    """Drop a user from the cache when their row is updated or deleted."""
+    user_cache.invalidate(target.email)
+    for old_email in inspect(target).attrs.email.history.deleted:
+        user_cache.invalidate(old_email)
+    token_versions.set(target.uid, target.token_version)
+
+
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="auth/token"
 )  # Define the token URL for OAuth2 authentication
@@ -31,17 +64,37 @@ def get_password_hash(password: str) -> str:
     return password_hasher.hash(password)
 
 
-async def get_user(db: Session = Depends(get_session), email: str = None):
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await hashing_pool.run(
+        "verify", verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await hashing_pool.run("hash", get_password_hash, password)
+
+
+async def warm_up_hashing():
+    """Start every hashing worker, so the first logins do not pay for it."""
+    hashed = await get_password_hash_async("warmup0password")
+    await hashing_pool.warm_up("verify", verify_password, "warmup0password", hashed)
+
+
+async def get_user(db: AsyncSession = Depends(get_async_session), email: str = None):
     """Retrieve a user from the database by email."""
     query = select(Users).where(Users.email == email)
-    result = db.exec(query).first()
+    result = (await db.exec(query)).first()
     if result:
         return result
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
 
 async def authenticate_user(
-    db: Session = Depends(get_session), email: str = None, password: str = None
+    db: AsyncSession = Depends(get_async_session),
+    email: str = None,
+    password: str = None,
 ):
     """Authenticate a user by verifying their email and password."""
     user = await get_user(db, email)
@@ -49,7 +102,7 @@ async def authenticate_user(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    if not verify_password(password, user.password):
+    if not await verify_password_async(password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password"
         )
@@ -64,12 +117,81 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=30)
     to_encode.update({"exp": expire})
+    # Unique id per token, so a single token can be revoked
+    to_encode.setdefault("jti", uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(data: dict) -> str:
+    """
+    Create a refresh token. Its "typ" claim keeps it from being used as an
+    access token, and keeps access tokens from being used to refresh.
+    """
+    return create_access_token({**data, "typ": "refresh"}, REFRESH_TOKEN_EXPIRE)
+
+
+def warm_up_jwt():
+    """Sign and verify a throwaway token, failing fast on bad JWT settings."""
+    token = create_access_token({"sub": "warm-up"}, timedelta(minutes=1))
+    jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+async def revoke_token(db: AsyncSession, token: str) -> bool:
+    """
+    Revoke a token until it expires, in the caller's transaction. Returns False
+    for tokens that are invalid or were issued without a jti.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except InvalidTokenError:
+        return False
+    if "jti" not in payload:
+        return False
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+    await revoked_tokens.revoke(db, payload["jti"], expires_at)
+    return True
+
+
+async def use_refresh_token(db: AsyncSession, token: str) -> bool:
+    """
+    Revoke a refresh token checked by verify_refresh_token, in the caller's
+    transaction. Returns False, with the transaction rolled back, if the token
+    was already used, including by a concurrent refresh.
+    """
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+    return await revoked_tokens.use(db, payload["jti"], expires_at)
+
+
+def token_claims(user: Users) -> dict:
+    """Build the claims that let get_current_user authorize without a DB lookup."""
+    token_versions.set(user.uid, user.token_version)
+    return {
+        "sub": user.email,
+        "uid": str(user.uid),
+        "admin": user.admin,
+        "active": user.active,
+        "ver": user.token_version,
+    }
+
+
+async def get_principal_from_claims(payload: dict, db: AsyncSession):
+    """Build the current user from token claims if the token version is current."""
+    principal = Principal(
+        uid=payload["uid"],
+        email=payload["sub"],
+        admin=payload.get("admin", False),
+        active=payload.get("active", False),
+    )
+    if await token_versions.get(db, principal.uid) != payload.get("ver"):
+        return None
+    return principal
+
+
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_session)
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_session),
 ):
     """Retrieve the current user based on the provided JWT token."""
     credentials_exception = HTTPException(
@@ -80,19 +202,44 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("typ") == "refresh":
             raise credentials_exception
         token_data = TokenData(email=email)
     except InvalidTokenError:
         raise credentials_exception
+    if await revoked_tokens.is_revoked(db, payload.get("jti")):
+        raise credentials_exception
+    if settings.AUTH_MODE == "claims" and "uid" in payload:
+        principal = await get_principal_from_claims(payload, db)
+        if principal is None:
+            raise credentials_exception
+        return principal
+    cached_user = user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
     user = await get_user(db, email=token_data.email)
     if user:
-        return user
+        current_user = Principal.model_validate(user)
+        user_cache.set(token_data.email, current_user)
+        return current_user
     raise credentials_exception
 
 
+async def get_read_session(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    last_write: Annotated[str | None, Cookie(alias=WRITE_COOKIE)] = None,
+):
+    """
+    Session for read-only endpoints: served by a read replica when configured,
+    or by the primary while the current user has recent writes, as remembered
+    by this worker or carried by the client's write marker cookie.
+    """
+    async with replica_router.session_for(current_user.uid, last_write) as session:
+        yield session
+
+
 async def get_current_active_user(
-    current_user: Annotated[Users, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     """Check if the current user is active and return the user if they are."""
     if current_user.active is False:
@@ -102,8 +249,21 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_admin(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+):
+    """Return the current user if they are an admin."""
+    if current_user.admin is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to perform this action",
+        )
+    return current_user
+
+
 async def verify_refresh_token(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_session)
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_session),
 ):
     """Verify the provided refresh token and return the associated user if valid."""
     try:
@@ -114,8 +274,8 @@ async def verify_refresh_token(
             "sub"
         )  # Extract the email (subject) from the token payload
         if (
-            email is None
-        ):  # If the email is not present in the token, raise an HTTP 401 Unauthorized exception
+            email is None or payload.get("typ") != "refresh" or "jti" not in payload
+        ):  # If the token is not a refresh token, raise an HTTP 401 Unauthorized exception
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token",
@@ -130,6 +290,12 @@ async def verify_refresh_token(
             detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if await revoked_tokens.is_revoked(db, payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     user = await get_user(
         db, email=token_data.email
     )  # Retrieve the user from the database using the email from the token
@@ -139,4 +305,11 @@ async def verify_refresh_token(
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Deactivation and permission changes bump the token version
+    if not user.active or payload.get("ver", user.token_version) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user  # Return the user associated with the valid refresh token
@@ -0,0 +1,38 @@
+from uuid import UUID
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.conn import Users
+from utils.cache import TTLCache
+from utils.settings import settings
+
+
+class TokenVersionStore:
+    """
+    Current token version per user id, read with a single-column lookup and
+    kept for `ttl` seconds. Updates made through the ORM in this process are
+    seen at once; those made by other workers, or directly in SQL, once the
+    cached version expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._versions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def set(self, uid: UUID, version: int):
+        self._versions.set(uid, version)
+
+    async def get(self, db: AsyncSession, uid: UUID) -> int | None:
+        version = self._versions.get(uid)
+        if version is None:
+            query = select(Users.token_version).where(Users.uid == uid)
+            version = (await db.exec(query)).first()
+            if version is not None:
+                self._versions.set(uid, version)
+        return version
+
+    def stats(self) -> dict:
+        return self._versions.stats()
+
+
+token_versions = TokenVersionStore(
+    maxsize=settings.TOKEN_VERSION_CACHE_SIZE, ttl=settings.TOKEN_VERSION_CACHE_TTL
+)
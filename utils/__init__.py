@@ -1,3 +1,27 @@
-from utils import settings
+from utils import (
+    cache,
+    etag,
+    export,
+    idempotency,
+    metrics,
+    pagination,
+    pubsub,
+    ratelimit,
+    serialization,
+    settings,
+    startup,
+)
 
-__all__ = ["settings"]
+__all__ = [
+    "cache",
+    "etag",
+    "export",
+    "idempotency",
+    "metrics",
+    "pagination",
+    "pubsub",
+    "ratelimit",
+    "serialization",
+    "settings",
+    "startup",
+]
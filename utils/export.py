@@ -0,0 +1,57 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+import orjson
+from utils.serialization import ITEM_FIELDS, ORDER_FIELDS
+
+# Export rows are the ORDER_FIELDS columns followed by these, one row per item
+ITEM_COLUMNS = tuple(f"item_{name}" for name in ITEM_FIELDS)
+
+
+async def ndjson_chunks(partitions):
+    """
+    Encode partitions of export rows as one JSON line per order with its items.
+    Rows of the same order must be adjacent; only one order is held at a time.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+    split = len(ORDER_FIELDS)
+    order = None
+    async for rows in partitions:
+        lines = []
+        for row in rows:
+            if order is None or order["uid"] != row[0]:
+                if order is not None:
+                    lines.append(orjson.dumps(order, option=options))
+                order = dict(zip(ORDER_FIELDS, row[:split]))
+                order["items"] = []
+            if row[split] is not None:
+                order["items"].append(dict(zip(ITEM_FIELDS, row[split:])))
+        if lines:
+            yield b"".join(lines)
+    if order is not None:
+        yield orjson.dumps(order, option=options)
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def csv_chunks(partitions):
+    """Encode partitions of export rows as CSV, one line per item."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ORDER_FIELDS + ITEM_COLUMNS)
+    async for rows in partitions:
+        writer.writerows([csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,157 @@
+import asyncio
+import re
+from hashlib import blake2b
+from utils.cache import TTLCache
+from utils.settings import settings
+
+# Mutations that honour the Idempotency-Key header
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/orders/$")),
+    ("POST", re.compile(r"^/orders/add-item/[^/]+$")),
+    ("POST", re.compile(r"^/orders/add-items/[^/]+$")),
+]
+
+# Responses are replayed with these headers only; the rest are recomputed
+REPLAYED_HEADERS = (b"content-type", b"etag")
+
+
+def digest(*parts: bytes) -> bytes:
+    hasher = blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(len(part).to_bytes(4, "big"))
+        hasher.update(part)
+    return hasher.digest()
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware making retried mutations safe. The first request with a
+    given Idempotency-Key runs normally and its successful response is kept
+    for IDEMPOTENCY_TTL seconds; repeats get that response back without
+    reaching the route, and duplicates arriving while it still runs wait for
+    it instead of running again. Keys are scoped to the caller's credentials
+    and the path, and reusing one with a different body is rejected.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # 16-byte key digest -> (body digest, status, headers, body)
+        self.responses = TTLCache(
+            maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL
+        )
+        # 16-byte key digest -> (body digest, future of the stored response)
+        self.in_flight: dict[bytes, tuple[bytes, asyncio.Future]] = {}
+
+    async def __call__(self, scope, receive, send):
+        idempotency_key = None
+        if scope["type"] == "http" and any(
+            scope["method"] == method and pattern.match(scope["path"])
+            for method, pattern in IDEMPOTENT_ROUTES
+        ):
+            headers = dict(scope["headers"])
+            idempotency_key = headers.get(b"idempotency-key")
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        key = digest(
+            headers.get(b"authorization", b""),
+            scope["path"].encode(),
+            idempotency_key,
+        )
+        body = await read_body(receive)
+        body_digest = digest(body)
+
+        while True:
+            stored = self.responses.get(key)
+            if stored is not None:
+                if stored[0] != body_digest:
+                    await send_conflict(send)
+                    return
+                await replay(send, stored)
+                return
+            pending = self.in_flight.get(key)
+            if pending is None:
+                break
+            if pending[0] != body_digest:
+                await send_conflict(send)
+                return
+            stored = await asyncio.shield(pending[1])
+            if stored is not None:
+                await replay(send, stored)
+                return
+            # The first attempt failed, so this one runs for real
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = (body_digest, future)
+        response = {"status": 500, "headers": [], "body": []}
+
+        async def receive_body():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        stored = None
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+            if 200 <= response["status"] < 300:
+                stored = (
+                    body_digest,
+                    response["status"],
+                    [
+                        (name, value)
+                        for name, value in response["headers"]
+                        if name.lower() in REPLAYED_HEADERS
+                    ],
+                    b"".join(response["body"]),
+                )
+                self.responses.set(key, stored)
+        finally:
+            del self.in_flight[key]
+            future.set_result(stored)
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def replay(send, stored: tuple):
+    _, status, headers, body = stored
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers
+            + [
+                (b"content-length", str(len(body)).encode()),
+                (b"idempotent-replayed", b"true"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_conflict(send):
+    body = b'{"detail":"Idempotency-Key was already used for a different request"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 422,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
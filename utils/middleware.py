@@ -0,0 +1,107 @@
+import math
+import time
+from database.instrumentation import track_queries
+from database.replicas import WRITE_COOKIE, replica_router, request_write_markers
+from utils.metrics import Counter, Histogram, registry
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Request latency by route.",
+        ("method", "route"),
+    )
+)
+REQUESTS = registry.register(
+    Counter(
+        "http_requests_total",
+        "Requests served by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+SQL_STATEMENTS = registry.register(
+    Counter(
+        "http_request_sql_statements_total",
+        "SQL statements executed while serving requests, by route.",
+        ("method", "route"),
+    )
+)
+SQL_SECONDS = registry.register(
+    Counter(
+        "http_request_sql_seconds_total",
+        "Time spent in SQL statements while serving requests, by route.",
+        ("method", "route"),
+    )
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL count/time per route.
+    Routes are labelled by their path template so ids do not create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                labels = (scope["method"], getattr(route, "path", "unmatched"))
+                REQUEST_DURATION.observe(labels, time.perf_counter() - start)
+                REQUESTS.inc(labels + (str(status_code),))
+                SQL_STATEMENTS.inc(labels, queries.count)
+                SQL_SECONDS.inc(labels, queries.seconds)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware returning the write markers of a request as the
+    WRITE_COOKIE cookie, so the client's next reads stay on the primary
+    whichever worker serves them. Does nothing without read replicas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        markers = []
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and markers:
+                cookie = (
+                    f"{WRITE_COOKIE}={markers[-1]}; Path=/; "
+                    f"Max-Age={math.ceil(replica_router.sticky_seconds)}; "
+                    "HttpOnly; SameSite=Lax"
+                )
+                headers = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_write_markers.set(markers)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            request_write_markers.reset(token)
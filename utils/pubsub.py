@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import contextmanager
+from utils.settings import settings
+
+
+class PubSub:
+    """
+    In-process publish/subscribe keyed by topic. Each subscriber owns a small
+    bounded queue, so an idle subscriber costs one queue and one waiting task;
+    a subscriber that stops reading loses its oldest events instead of
+    holding memory. Only subscribers in the same worker process are reached.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[object, set[asyncio.Queue]] = {}
+
+    @contextmanager
+    def subscribe(self, topic):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(topic)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[topic]
+
+    def publish(self, topic, message):
+        for queue in self._subscribers.get(topic, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._subscribers),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+        }
+
+
+# Order changes keyed by the owning user's uid, consumed by GET /orders/stream
+order_events = PubSub(queue_size=settings.ORDER_STREAM_QUEUE_SIZE)
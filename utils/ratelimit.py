@@ -0,0 +1,151 @@
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+import jwt
+from jwt.exceptions import InvalidTokenError
+from utils.cache import TTLCache
+from utils.metrics import Counter, registry
+from utils.settings import settings
+
+REJECTED = registry.register(
+    Counter(
+        "rate_limit_rejected_total",
+        "Requests rejected with 429 by the rate limiter, by budget.",
+        ("budget",),
+    )
+)
+
+
+class RateLimit(NamedTuple):
+    """Bucket of `count` tokens, refilled evenly over `period` seconds."""
+
+    count: int
+    period: float
+
+    @classmethod
+    def parse(cls, text: str) -> "RateLimit":
+        """Parse budgets such as "10/minute" or "5/second"."""
+        count, unit = text.split("/")
+        periods = {"second": 1, "minute": 60, "hour": 3600}
+        return cls(int(count), periods[unit.strip()])
+
+
+# Budgets by (method, path pattern); the first match wins, others get "default"
+ROUTE_BUDGETS = [
+    ("auth", "POST", re.compile(r"^/auth/(token|signup)$")),
+    ("list_orders", "GET", re.compile(r"^/orders/$")),
+]
+
+
+class MemoryBackend:
+    """
+    Token buckets kept in process memory. Only the least recently used
+    `maxsize` buckets are kept; an evicted client simply starts full again.
+    Other backends (e.g. a shared store) implement the same `take`.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        # key -> [tokens left, time of last refill]
+        self._buckets: OrderedDict = OrderedDict()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """Take one token; return 0 if allowed, else seconds until one is free."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(limit.count), now]
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            refill = (now - bucket[1]) * limit.count / limit.period
+            bucket[0] = min(float(limit.count), bucket[0] + refill)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) * limit.period / limit.count
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying per-route token-bucket budgets, keyed by the JWT
+    subject when the request carries a valid token and by client IP otherwise.
+    Requests over budget get an immediate 429 with Retry-After. The client IP
+    is the proxy's unless the server is run with --proxy-headers.
+    """
+
+    def __init__(self, app, backend=None):
+        self.app = app
+        self.backend = backend or MemoryBackend(settings.RATE_LIMIT_STORE_SIZE)
+        self.budgets = {
+            "default": RateLimit.parse(settings.RATE_LIMIT_DEFAULT),
+            "auth": RateLimit.parse(settings.RATE_LIMIT_AUTH),
+            "list_orders": RateLimit.parse(settings.RATE_LIMIT_LIST_ORDERS),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        budget = next(
+            (
+                name
+                for name, method, pattern in ROUTE_BUDGETS
+                if scope["method"] == method and pattern.match(scope["path"])
+            ),
+            "default",
+        )
+        retry_after = await self.backend.take(
+            f"{budget}:{client_identity(scope)}", self.budgets[budget]
+        )
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        REJECTED.inc((budget,))
+        body = b'{"detail":"Too many requests"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(retry_after)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+# Authorization header -> verified subject ("" if none), so each token's
+# signature is checked once per minute rather than on every request
+token_subjects = TTLCache(maxsize=settings.RATE_LIMIT_STORE_SIZE, ttl=60)
+
+
+def client_identity(scope) -> str:
+    """The verified JWT subject of the request, or else its client IP."""
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            subject = token_subjects.get(value)
+            if subject is None:
+                try:
+                    payload = jwt.decode(
+                        value[7:].decode(),
+                        settings.SECRET_KEY,
+                        algorithms=[settings.ALGORITHM],
+                    )
+                    subject = str(payload.get("sub") or "")
+                except (InvalidTokenError, UnicodeDecodeError):
+                    subject = ""
+                token_subjects.set(value, subject)
+            if subject:
+                return "sub:" + subject
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
@@ -0,0 +1,28 @@
+import orjson
+from fastapi import Response
+from schemas.schemas import ItemRead, OrderRead
+
+# Field lists come from the response schemas so the fast path cannot drift from them
+ITEM_FIELDS = tuple(ItemRead.model_fields)
+ORDER_FIELDS = tuple(name for name in OrderRead.model_fields if name != "items")
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered by orjson; datetimes use a Z suffix like Pydantic."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def order_to_dict(order) -> dict:
+    """
+    Read an Orders row and its loaded items straight into OrderRead's shape.
+    The row already came from the database, so it is not validated again.
+    """
+    data = {name: getattr(order, name) for name in ORDER_FIELDS}
+    data["items"] = [
+        {name: getattr(item, name) for name in ITEM_FIELDS} for item in order.items
+    ]
+    return data
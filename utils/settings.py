@@ -3,13 +3,122 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag such as "true"/"1"/"yes" from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_async_database_url(url: str | None) -> str | None:
+    """Derive the async driver URL from a synchronous database URL."""
+    if not url:
+        return url
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
 
 class Config:
 
     DATABASE_URL = os.getenv("DATABASE_URL")
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(
+        DATABASE_URL
+    )
+
+    # Comma-separated read replica URLs used by read-only endpoints, and how long
+    # a user's reads stay on the primary after they write. Across workers this
+    # relies on the client sending back the signed "last_write" cookie
+    READ_REPLICA_URLS = [
+        url.strip()
+        for url in os.getenv("READ_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+    # Connection pool, applied to the primary engines and every replica
+    DB_ECHO = get_bool("DB_ECHO", False)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Recycling below MySQL's wait_timeout already avoids stale connections;
+    # pre-ping adds a round trip to every checkout, so it is opt-in
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = get_bool("DB_POOL_PRE_PING", False)
+    # Connections opened per pool at startup, capped at DB_POOL_SIZE
+    DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", DB_POOL_SIZE))
     SECRET_KEY = os.getenv("SECRET_KEY")
     ALGORITHM = os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+    # "database" loads the user on every request, "claims" trusts the token claims
+    AUTH_MODE = os.getenv("AUTH_MODE", "database")
+
+    # Maximum number of items accepted by POST /orders/add-items/{order_id}
+    ITEM_BATCH_MAX_SIZE = int(os.getenv("ITEM_BATCH_MAX_SIZE", 100))
+
+    # GET /orders/stream: seconds between keep-alive comments, events buffered per subscriber
+    ORDER_STREAM_KEEPALIVE = float(os.getenv("ORDER_STREAM_KEEPALIVE", 15))
+    ORDER_STREAM_QUEUE_SIZE = int(os.getenv("ORDER_STREAM_QUEUE_SIZE", 32))
+
+    # Optional group commit of new orders: concurrent creations are written in
+    # shared transactions of up to BATCH_SIZE rows, waiting at most MAX_WAIT_MS
+    ORDER_INGEST_ENABLED = get_bool("ORDER_INGEST_ENABLED", False)
+    ORDER_INGEST_BATCH_SIZE = int(os.getenv("ORDER_INGEST_BATCH_SIZE", 100))
+    ORDER_INGEST_MAX_WAIT_MS = float(os.getenv("ORDER_INGEST_MAX_WAIT_MS", 5))
+
+    # Successful responses kept for replaying requests with an Idempotency-Key
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", 24 * 60 * 60))
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+
+    # Token-bucket rate limits per client, as "<count>/<second|minute|hour>".
+    # Off by default: anonymous requests (sign in, sign up) are keyed by client
+    # IP, so behind a proxy or load balancer the app must trust its forwarded
+    # headers (uvicorn --proxy-headers --forwarded-allow-ips ...), or every
+    # client shares the proxy's budget
+    RATE_LIMIT_ENABLED = get_bool("RATE_LIMIT_ENABLED", False)
+    RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "20/second")
+    RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/minute")
+    RATE_LIMIT_LIST_ORDERS = os.getenv("RATE_LIMIT_LIST_ORDERS", "60/minute")
+    RATE_LIMIT_STORE_SIZE = int(os.getenv("RATE_LIMIT_STORE_SIZE", 100000))
+
+    # Rows fetched per round trip by the streaming order export
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+
+    # Seconds between checks of the stored catalog version by the price cache
+    CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", 30))
+
+    # Finalized orders older than this many days are moved to the archive tables
+    ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+    # Orders whose totals are checked against their items per transaction
+    RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", 1000))
+
+    # Password hashing pool ("thread" or "process")
+    HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "thread")
+    HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 1))
+    HASH_POOL_QUEUE_SIZE = int(os.getenv("HASH_POOL_QUEUE_SIZE", 32))
+
+    # Seconds between loads of tokens revoked by other workers
+    REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", 5))
+
+    # Cache of authenticated users resolved by get_current_user
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+
+    # Token versions checked by AUTH_MODE=claims; a version bumped by another
+    # worker or in SQL is seen once the cached one is this many seconds old
+    TOKEN_VERSION_CACHE_SIZE = int(os.getenv("TOKEN_VERSION_CACHE_SIZE", 10000))
+    TOKEN_VERSION_CACHE_TTL = float(os.getenv("TOKEN_VERSION_CACHE_TTL", 5))
 
 
 settings = Config()
@@ -0,0 +1,50 @@
+import logging
+import time
+from contextlib import contextmanager
+
+# Uvicorn configures this logger, so the report shows up next to its own startup lines
+logger = logging.getLogger("uvicorn.error")
+
+
+class StartupReport:
+    """
+    Milliseconds spent on each import and warm-up step while the app starts.
+    """
+
+    def __init__(self):
+        self.steps: dict[str, dict] = {}
+
+    def record(self, name: str, seconds: float, error: str | None = None):
+        self.steps[name] = {"ms": round(seconds * 1000, 1), "error": error}
+
+    @contextmanager
+    def step(self, name: str, required: bool = True):
+        """
+        Time the enclosed block under `name`. A failing step that is not
+        `required` is logged and recorded instead of aborting startup.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            self.record(name, time.perf_counter() - start, repr(exc))
+            if required:
+                raise
+            logger.warning("Startup step %s failed: %r", name, exc)
+        else:
+            self.record(name, time.perf_counter() - start)
+
+    def total(self) -> float:
+        return sum(step["ms"] for step in self.steps.values())
+
+    def log(self):
+        for name, step in self.steps.items():
+            suffix = f" (failed: {step['error']})" if step["error"] else ""
+            logger.info("Startup %-28s %8.1f ms%s", name, step["ms"], suffix)
+        logger.info("Startup %-28s %8.1f ms", "total", self.total())
+
+    def as_dict(self) -> dict:
+        return {"total_ms": round(self.total(), 1), "steps": self.steps}
+
+
+startup_report = StartupReport()